@@ -1,9 +1,94 @@
 import streamlit as st
 import streamlit.components.v1 as components
+import os
+import sys
+import time
+from pathlib import Path
 
-# Read your HTML file
-with open("output/knowledge_graph.html", "r") as f:
-    html_data = f.read()
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.entity_index import ENTITY_INDEX_DIR, EntityIndex
+from utils.kg_normalize import KG_GRAPH_FILE
+from utils.kg_render import subgraph_html
+from utils.kg_store import DEFAULT_MAX_NODES, KG_DIR, load_kg
+from utils.meta_store import META_DB_FILE, MetaStore
+from utils.query_cache import file_signature
 
-# Render the HTML file
-components.html(html_data, height=800, scrolling=True)
\ No newline at end of file
+KG_HTML_FILE = "output/knowledge_graph.html"
+# Rendered subgraph fragments kept per (entity, hops, budget, ranking)
+FRAGMENT_CACHE_SIZE = 128
+GRAPH_HEIGHT = 750
+# Source papers listed for the selected entity
+SOURCE_PAPERS = 20
+
+st.set_page_config(page_title="Knowledge Graph Explorer", layout="wide")
+st.title(" Knowledge Graph Explorer")
+
+# Keyed on the graph files' signature so a rebuilt graph is picked up
+@st.cache_resource(show_spinner=True)
+def load_graph_store(signature):
+    return load_kg()
+
+@st.cache_data(max_entries=FRAGMENT_CACHE_SIZE, show_spinner=False)
+def render_fragment(signature, seed, hops, max_nodes, rank):
+    # only the neighbourhood of the chosen entity is shipped to the browser
+    kg = load_graph_store(signature)
+    nodes, edges = kg.subgraph([seed], hops=hops, max_nodes=max_nodes, rank=rank)
+    html = subgraph_html(kg, nodes, edges, highlight=[seed], height=f"{GRAPH_HEIGHT}px")
+    return html, len(nodes), len(edges)
+
+@st.cache_resource(show_spinner=False)
+def load_entity_index(signature):
+    if not os.path.exists(os.path.join(ENTITY_INDEX_DIR, "entities.json")):
+        return None
+    return EntityIndex.load(ENTITY_INDEX_DIR)
+
+@st.cache_resource
+def load_meta():
+    return MetaStore(META_DB_FILE, readonly=True) if os.path.exists(META_DB_FILE) else None
+
+signature = file_signature(KG_GRAPH_FILE, os.path.join(KG_DIR, "graph.json"))
+if not os.path.exists(KG_GRAPH_FILE) and not os.path.exists(os.path.join(KG_DIR, "graph.json")):
+    # no indexed graph yet: fall back to the pre-rendered page from build_kg.py
+    st.warning("No indexed graph found; run scripts/build_kg.py. Showing the pre-rendered graph.")
+    with open(KG_HTML_FILE, "r") as f:
+        components.html(f.read(), height=800, scrolling=True)
+    st.stop()
+
+kg = load_graph_store(signature)
+
+col1, col2 = st.columns([3, 1])
+with col2:
+    hops = st.slider("Hops", min_value=1, max_value=3, value=2)
+    max_nodes = st.number_input("Max nodes", value=DEFAULT_MAX_NODES, min_value=10, max_value=1000, step=10)
+    rank = st.radio("Keep nodes by", ["support", "degree"],
+                    help="support: total triplet count on the edges to the kept nodes; degree: connectedness")
+with col1:
+    term = st.text_input("Entity or search term:", value="", max_chars=100)
+    matches = kg.find(term, limit=20) if term.strip() else [i for i, _ in kg.top_degree(20)]
+    if not matches:
+        st.info(f"No entity matches '{term}'.")
+        st.stop()
+    seed = st.selectbox("Entity", matches,
+                        format_func=lambda i: f"{kg.labels[i]} ({int(kg.degree[i])} links)")
+
+start = time.perf_counter()
+html, n_nodes, n_edges = render_fragment(signature, int(seed), hops, int(max_nodes), rank)
+components.html(html, height=GRAPH_HEIGHT + 50, scrolling=True)
+st.caption(f"{n_nodes} of {len(kg)} entities, {n_edges} of {kg.num_edges} relations "
+           f"• {(time.perf_counter() - start) * 1000:.0f} ms")
+
+# papers the selected entity was extracted from (data/entity_index, written by the triplet extractors)
+entity_index = load_entity_index(file_signature(os.path.join(ENTITY_INDEX_DIR, "entities.json")))
+if entity_index is not None:
+    sources = entity_index.papers_for(kg.labels[seed], SOURCE_PAPERS)
+    st.subheader(f"Source papers for '{kg.labels[seed]}'")
+    if not sources:
+        st.write("No source papers recorded for this entity.")
+    meta = load_meta()
+    titles = meta.get_by_pmcids(pmcid for pmcid, _, _ in sources) if meta is not None and sources else {}
+    for pmcid, mentions, sections in sources:
+        record = titles.get(pmcid) or {}
+        title = record.get("title") or record.get("meta_title") or pmcid
+        link = record.get("source_link")
+        st.markdown(f"- {f'[{title}]({link})' if link else title} — {pmcid}, {mentions} mentions "
+                    f"({', '.join(s for s in sections if s) or 'unknown section'})")
@@ -1,32 +1,104 @@
 import streamlit as st
-import json
+import os
+import re
+import sys
+from pathlib import Path
 import faiss
-from sentence_transformers import SentenceTransformer
-import numpy as np
 
-FAISS_INDEX_FILE = "data/papers_index.faiss"
-META_FILE = "data/papers_meta.json"
-EMBED_MODEL = "all-minilm-l6-v2"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.bm25 import BM25_DIR
+from utils.chunk_store import CHUNK_DIR, CHUNK_INDEX_FILE, ChunkStore, aggregate_hits
+from utils.entity_index import ENTITY_INDEX_DIR, EntityIndex
+from utils.meta_store import META_DB_FILE
+from utils.paper_search import FAISS_INDEX_FILE, SEARCH_MODES, PaperSearcher
+from utils.query_cache import SemanticQueryCache, file_signature
+from utils.search_client import SEARCH_SERVICE_URL, SearchClient
+
+# Passage mode retrieves this many chunks per requested paper before aggregating
+CHUNKS_PER_PAPER = 10
+# Result cache shared by all sessions: LRU size, TTL, and the cosine similarity
+# at which a near-identical query reuses cached results
+QUERY_CACHE_SIZE = 512
+QUERY_CACHE_TTL = 3600
+QUERY_CACHE_SIMILARITY = 0.97
+# Knowledge-graph entities listed under each result
+RELATED_ENTITIES = 8
 
 st.set_page_config(page_title="NASA Space Biology Knowledge Engine", layout="wide")
 st.title(" NASA Space Biology Knowledge Engine (Prototype)")
 st.write("Search and summarize findings from NASA space biology publications.")
 
-# Load meta & index (single-time)
-@st.cache_data(show_spinner=True)
-def load_index_and_meta():
-    # Load FAISS index
-    index = faiss.read_index(FAISS_INDEX_FILE)
+# Load meta, index & model (single-time, shared with the summary app's artifacts).
+# Keyed on the index files' signature so a rebuilt index is picked up.
+@st.cache_resource(show_spinner=True)
+def load_searcher(signature):
+    return PaperSearcher()
+
+@st.cache_resource(show_spinner=True)
+def load_chunk_index(signature):
+    if not os.path.exists(os.path.join(CHUNK_DIR, CHUNK_INDEX_FILE)):
+        return None, None
+    return faiss.read_index(os.path.join(CHUNK_DIR, CHUNK_INDEX_FILE)), ChunkStore(CHUNK_DIR)
+
+@st.cache_resource(show_spinner=False)
+def load_entity_index(signature):
+    if not os.path.exists(os.path.join(ENTITY_INDEX_DIR, "entities.json")):
+        return None
+    return EntityIndex.load(ENTITY_INDEX_DIR)
 
-    # Load meta
-    with open(META_FILE, "r", encoding="utf-8") as f:
-        meta = json.load(f)
+@st.cache_resource
+def load_search_client(url):
+    return SearchClient(url)
 
-    # Load model
-    model = SentenceTransformer(EMBED_MODEL)
-    return index, meta, model
+@st.cache_resource
+def load_query_cache():
+    return SemanticQueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL, QUERY_CACHE_SIMILARITY)
 
-index, meta, model = load_index_and_meta()
+def highlight(text, query):
+    # bold the query terms inside the best-matching passage
+    terms = [re.escape(t) for t in query.split() if len(t) > 2]
+    if not terms:
+        return text
+    return re.sub(r"(?i)\b(" + "|".join(terms) + r")", r"**\1**", text)
+
+def render_result(rank, item, score, query, passage=None):
+    st.markdown(f"#### {rank}. {item.get('title') or item.get('meta_title')}")
+    st.write(f"**PMCID:** {item.get('pmcid')}   •   **Score:** {score:.4f}")
+    related = entity_index.entities_for(item.get("pmcid"), RELATED_ENTITIES) if entity_index is not None else []
+    if related:
+        # same entity keys as the knowledge graph; look them up in renderer/knowledge-graph.py
+        st.caption("**Graph entities:** " + " • ".join(f"{label} ({n})" for label, n in related))
+    if passage is not None:
+        st.info(f"**Best passage — {passage['section']}:**\n\n{highlight(passage['text'], query)}")
+    if item.get("abstract"):
+        st.write("**Abstract:**")
+        st.write(item["abstract"][:1000] + ("..." if len(item["abstract"]) > 1000 else ""))
+    elif item.get("full_text_preview"):
+        st.write(item["full_text_preview"][:1000] + ("..." if len(item["full_text_preview"]) > 1000 else ""))
+    # show results/conclusion if present
+    if item.get("results"):
+        st.write("**Results excerpt:**")
+        st.write(item["results"][:800] + ("..." if len(item["results"]) > 800 else ""))
+    if item.get("conclusion"):
+        st.write("**Conclusion excerpt:**")
+        st.write(item["conclusion"][:800] + ("..." if len(item["conclusion"]) > 800 else ""))
+    if item.get("source_link"):
+        st.markdown(f"[Open source]({item.get('source_link')})")
+    st.markdown("---")
+
+signature = file_signature(FAISS_INDEX_FILE, META_DB_FILE, os.path.join(CHUNK_DIR, CHUNK_INDEX_FILE),
+                           os.path.join(BM25_DIR, "vocab.json"))
+if SEARCH_SERVICE_URL:
+    # thin client: renderer/search-service.py owns the model and the index
+    client = load_search_client(SEARCH_SERVICE_URL)
+    searcher, chunk_index, chunk_store = None, None, None
+else:
+    searcher = load_searcher(signature)
+    chunk_index, chunk_store = load_chunk_index(signature)
+query_cache = load_query_cache()
+entity_index = load_entity_index(file_signature(os.path.join(ENTITY_INDEX_DIR, "entities.json")))
+# drops every cached result when an index file changes
+query_cache.validate(signature)
 
 # Query input
 query = st.text_input("Ask a question or enter a search query:", value="", max_chars=200)
@@ -35,34 +107,58 @@ col1, col2 = st.columns([3, 1])
 
 with col2:
     top_k = st.number_input("Top K", value=5, min_value=1, max_value=20, step=1)
+    search_modes = ["Papers", "Passages"] if chunk_index is not None else ["Papers"]
+    search_mode = st.radio("Search over", search_modes)
+    aggregation, retrieval = None, None
+    if search_mode == "Passages":
+        aggregation = st.selectbox("Paper score", ["max", "sum"])
+    else:
+        # auto: identifier-like queries (genes, missions, PMCIDs) go lexical, the rest hybrid
+        retrieval = st.selectbox("Retrieval", SEARCH_MODES)
+
+def run_search(qvec):
+    results = []
+    if search_mode == "Passages":
+        # retrieve chunks, then fold them back into papers
+        D, I = chunk_index.search(qvec, top_k * CHUNKS_PER_PAPER)
+        hits = aggregate_hits(I[0], D[0], chunk_store.paper_ids, aggregation, top_k)
+        meta_by_pmcid = searcher.meta.get_by_pmcids(chunk_store.papers[paper] for paper, _, _, _ in hits)
+        for paper, score, chunk_id, _ in hits:
+            pmcid = chunk_store.papers[paper]
+            item = meta_by_pmcid.get(pmcid) or {"pmcid": pmcid, "title": pmcid}
+            results.append((item, score, chunk_store.chunk(chunk_id)))
+    else:
+        results = [(item, score, None) for item, score in searcher.search(query, top_k, retrieval, qvec=qvec[0])]
+    return results
 
 if st.button("Search") and query.strip():
     with st.spinner("Searching..."):
-        qvec = model.encode([query], convert_to_numpy=True, normalize_embeddings=True)
-        D, I = index.search(qvec, top_k)
-        scores = D[0]
-        ids = I[0]
-
-    st.success(f"Found {len(ids)} results.")
-    for rank, (idx, score) in enumerate(zip(ids, scores), start=1):
-        if idx < 0 or idx >= len(meta):
-            continue
-        item = meta[idx]
-        st.markdown(f"#### {rank}. {item.get('title') or item.get('meta_title')}")
-        st.write(f"**PMCID:** {item.get('pmcid')}   •   **Score:** {score:.4f}")
-        if item.get("abstract"):
-            st.write("**Abstract:**")
-            st.write(item["abstract"][:1000] + ("..." if len(item["abstract"]) > 1000 else ""))
-        elif item.get("full_text_preview"):
-            st.write(item["full_text_preview"][:1000] + ("..." if len(item["full_text_preview"]) > 1000 else ""))
-        # show results/conclusion if present
-        if item.get("results"):
-            st.write("**Results excerpt:**")
-            st.write(item["results"][:800] + ("..." if len(item["results"]) > 800 else ""))
-        if item.get("conclusion"):
-            st.write("**Conclusion excerpt:**")
-            st.write(item["conclusion"][:800] + ("..." if len(item["conclusion"]) > 800 else ""))
-        st.markdown(f"[Open source]({item.get('source_link')})")
-        st.markdown("---")
+        if searcher is not None and retrieval is not None:
+            retrieval = searcher.resolve_mode(query, retrieval)
+        namespace = (search_mode, aggregation, retrieval, int(top_k))
+        # exact text hit skips the encoder; otherwise try a near-identical cached query.
+        # The thin client and BM25-only searches have no vector, so they only match exactly.
+        dense = searcher is not None and retrieval != "lexical"
+        encode = (lambda: searcher.encode([query])[0]) if dense else None
+        results, qvec = query_cache.lookup(query, namespace, encode)
+        if results is None and searcher is None:
+            results = [(item, score, None) for item, score in client.search(query, top_k, retrieval)]
+            query_cache.put(query, None, results, namespace)
+        elif results is None and not dense:
+            results = [(item, score, None) for item, score in searcher.search(query, top_k, "lexical")]
+            query_cache.put(query, None, results, namespace)
+        elif results is None:
+            results = run_search(qvec[None])
+            query_cache.put(query, qvec, results, namespace)
+
+    st.success(f"Found {len(results)} results.")
+    for rank, (item, score, passage) in enumerate(results, start=1):
+        render_result(rank, item, score, query, passage)
 else:
     st.info("Enter a query and click Search to begin. Example queries: 'plant growth microgravity', 'radiation DNA damage', 'bone loss astronaut'.")
+
+stats = query_cache.stats()
+st.sidebar.caption(
+    f"Query cache: {stats['entries']} entries • hit rate {stats['hit_rate']:.0%} "
+    f"({stats['exact_hits']} exact, {stats['semantic_hits']} similar, {stats['misses']} misses)"
+)
@@ -0,0 +1,116 @@
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.micro_batch import DEFAULT_MAX_BATCH, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from utils.paper_search import HYBRID_DEPTH, SEARCH_MODES, PaperSearcher
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_TOP_K = 50
+
+
+def make_batch_search(searcher):
+    """One encode + one index.search for a whole batch of (query, depth) requests; returns raw dense hits."""
+    def batch_search(requests):
+        qvecs = searcher.encode([query for query, _ in requests])
+        hits = searcher.dense_hits(qvecs, max(depth for _, depth in requests))
+        return [h[:depth] for h, (_, depth) in zip(hits, requests)]
+    return batch_search
+
+
+def run_search(searcher, batcher, query, top_k, mode):
+    """Lexical queries skip the batcher (no encode); dense/hybrid share the batched encode."""
+    mode = searcher.resolve_mode(query, mode)
+    if mode == "lexical":
+        hits = searcher.lexical_hits(query, top_k)
+    elif mode == "hybrid":
+        depth = top_k * HYBRID_DEPTH
+        hits = searcher.fuse(batcher((query, depth)), searcher.lexical_hits(query, depth), top_k)
+    else:
+        hits = batcher((query, top_k))
+    return mode, searcher.with_records([hits])[0]
+
+
+class SearchHandler(BaseHTTPRequestHandler):
+    searcher = None
+    batcher = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send(200, self.batcher.stats())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/search":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            query = (payload.get("query") or "").strip()
+            top_k = max(1, min(int(payload.get("top_k", 5)), MAX_TOP_K))
+            mode = payload.get("mode") or "auto"
+        except (ValueError, TypeError, AttributeError):
+            self._send(400, {"error": "expected JSON body {\"query\": str, \"top_k\": int, \"mode\": str}"})
+            return
+        if not query:
+            self._send(400, {"error": "query is empty"})
+            return
+        if mode not in SEARCH_MODES:
+            self._send(400, {"error": f"mode must be one of {', '.join(SEARCH_MODES)}"})
+            return
+
+        try:
+            mode, hits = run_search(self.searcher, self.batcher, query, top_k, mode)
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+            return
+        self._send(200, {"query": query, "mode": mode,
+                         "results": [{"item": item, "score": score} for item, score in hits]})
+
+    def log_message(self, format, *args):
+        # keep the console quiet under load
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON search service over the paper index.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    print("Loading index and embedding model...")
+    searcher = PaperSearcher()
+    SearchHandler.searcher = searcher
+    SearchHandler.batcher = MicroBatcher(make_batch_search(searcher), args.max_batch, args.max_wait_ms)
+
+    server = ThreadingHTTPServer((args.host, args.port), SearchHandler)
+    print(f"Search service on http://{args.host}:{args.port} (POST /search, GET /stats, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        SearchHandler.batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,115 @@
 import streamlit as st
-import json
+import os
+import queue
+import sys
+import threading
 import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from sentence_transformers import SentenceTransformer, util
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.extractive import reduce_paper
+from utils.inference import load_embedder as load_embedding_model
+from utils.paper_search import EMBED_MODEL, PaperSearcher
+from utils.summarization import SUMMARY_MODEL, QueueStreamer, build_input_text, load_summarizer, stream_summary
+from utils.summary_store import SUMMARIES_FILE, SummaryStore, input_hash
+
+# Concurrent summary generations; the CPU threads are split between them
+SUMMARY_WORKERS = min(3, os.cpu_count() or 1)
 
 # -----------------------------
-# Load Model and Tokenizer
+# Background Summarizer
 # -----------------------------
-@st.cache_resource
-def load_summarizer():
-    model_name = "allenai/led-large-16384-arxiv"
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model.to(device)
-    return tokenizer, model, device
+class SummaryWorker:
+    """
+    Generates summaries the store does not have yet on a bounded pool of
+    background threads, streaming tokens to the page as they are decoded,
+    and writes each back to data/summaries.json. The LED model is only
+    loaded the first time a summary is actually missing.
+
+    With a `query`, the input is first cut down to the sentences closest to
+    the query (fast mode); those summaries are query-specific, so they are
+    shown but not stored.
+    """
+
+    def __init__(self, store, embedder, model_name=SUMMARY_MODEL):
+        self.store = store
+        self.embedder = embedder
+        self.model_name = model_name
+        self._executor = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS)
+        self._pending = {}  # (pmcid, query) -> Future, shared by every session
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._model = None
+
+    def _load(self):
+        with self._model_lock:
+            if self._model is None:
+                torch.set_num_threads(max(1, (os.cpu_count() or 1) // SUMMARY_WORKERS))
+                self._model = load_summarizer(self.model_name)
+        return self._model
+
+    def _generate(self, paper, h, query, events, key):
+        try:
+            tokenizer, model, device = self._load()
+            if query:
+                text = reduce_paper(paper, self.embedder, tokenizer, query=query)
+            else:
+                text = build_input_text(paper)
+            summary = stream_summary(text, tokenizer, model, device, QueueStreamer(tokenizer, events, key))
+            if not query:
+                # greedy decoding: scripts/summarizer.py replaces it with a beam-search summary
+                self.store.put(paper["pmcid"], paper.get("title") or "", summary, h, self.model_name, "stream")
+                self.store.save()
+            return summary
+        finally:
+            with self._lock:
+                self._pending.pop((paper["pmcid"], query), None)
+
+    def submit(self, paper, h, query, events, key):
+        """
+        Queue one summary. Text pieces arrive on `events` as (key, str) and
+        the finished Future as (key, future). A summary another session is
+        already generating is not started twice; this caller then only gets
+        the final result.
+        """
+        pending_key = (paper["pmcid"], query)
+        with self._lock:
+            future = self._pending.get(pending_key)
+            if future is None:
+                future = self._executor.submit(self._generate, paper, h, query, events, key)
+                self._pending[pending_key] = future
+        future.add_done_callback(lambda f: events.put((key, f)))
+        return future
 
 # -----------------------------
-# Load Embedding Model
+# Load Summary Store
 # -----------------------------
 @st.cache_resource
-def load_embedder():
-    return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+def load_summary_worker(_embedder):
+    return SummaryWorker(SummaryStore(SUMMARIES_FILE), _embedder)
 
 # -----------------------------
-# Load Paper Data
+# Load Embedding Model
 # -----------------------------
-@st.cache_data
-def load_papers():
-    with open("data/papers.json", "r", encoding="utf-8") as f:
-        papers = json.load(f)
-    return papers
+@st.cache_resource
+def load_embedder():
+    return load_embedding_model(EMBED_MODEL)
 
 # -----------------------------
-# Summarization Function
+# Load Paper Index
 # -----------------------------
-def generate_summary(text, tokenizer, model, device):
-    inputs = tokenizer(
-        text,
-        return_tensors="pt",
-        max_length=16000,
-        truncation=True
-    ).to(device)
-
-    summary_ids = model.generate(
-        **inputs,
-        max_length=512,
-        num_beams=4,
-        length_penalty=2.0,
-        early_stopping=True
-    )
-
-    summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-    return summary
+@st.cache_resource
+def load_searcher(_embedder):
+    # Same FAISS index + meta the query app uses (built by semantic-searching.py)
+    return PaperSearcher(model=_embedder)
 
 # -----------------------------
 # Search Function
 # -----------------------------
-def search_papers(query, papers, embedder, top_k=3):
-    corpus = [p["title"] + " " + p.get("abstract", "") for p in papers]
-    corpus_embeddings = embedder.encode(corpus, convert_to_tensor=True)
-    query_embedding = embedder.encode(query, convert_to_tensor=True)
-    hits = util.semantic_search(query_embedding, corpus_embeddings, top_k=top_k)[0]
-    return [papers[hit["corpus_id"]] for hit in hits]
+def search_papers(query, searcher, top_k=3):
+    # one query encode + index lookup; the corpus is embedded once at build time
+    return [paper for paper, _ in searcher.search(query, top_k)]
 
 # -----------------------------
 # Streamlit UI
@@ -72,30 +119,56 @@ st.title("🧠 Research Paper Summarizer")
 st.markdown("Enter your research query to get summarized insights from papers.")
 
 # Load models and data
-tokenizer, model, device = load_summarizer()
 embedder = load_embedder()
-papers = load_papers()
+searcher = load_searcher(embedder)
+worker = load_summary_worker(embedder)
 
 query = st.text_input("🔍 Enter your query (e.g., 'Effects of microgravity on immune system'):")
+fast = st.checkbox("⚡ Fast mode: summarize only the sentences most relevant to the query",
+                   help="Precomputed summaries are still used when available.")
 
 if st.button("Generate Summary"):
     if not query.strip():
         st.warning("Please enter a query.")
     else:
-        with st.spinner("Searching and summarizing papers..."):
-            relevant_papers = search_papers(query, papers, embedder)
-            st.success(f"Found {len(relevant_papers)} relevant papers.")
-
-            for paper in relevant_papers:
-                title = paper.get("title", "")
-                abstract = paper.get("abstract", "")
-                results = paper.get("results", "")
+        with st.spinner("Searching papers..."):
+            relevant_papers = search_papers(query, searcher)
+        st.success(f"Found {len(relevant_papers)} relevant papers.")
+        # pick up summaries written by scripts/summarizer.py since the last query
+        worker.store.reload()
 
-                input_text = f"Title: {title}\n\nAbstract: {abstract}\n\nResults: {results}"
-                summary = generate_summary(input_text, tokenizer, model, device)
+        events = queue.Queue()
+        streams = {}  # result index -> [placeholder, text so far]
+        for i, paper in enumerate(relevant_papers):
+            title = paper.get("title") or paper.get("meta_title") or ""
+            abstract = paper.get("abstract") or ""
+            h = input_hash(build_input_text(paper), worker.model_name)
+            # summaries from before input hashes were recorded are still served
+            entry = worker.store.get(paper["pmcid"], h, allow_legacy=True, allow_fast=fast, allow_stream=True)
 
-                with st.expander(f"📄 {title}"):
-                    st.markdown(f"**Summary:** {summary}")
-                    st.markdown("---")
-                    st.markdown(f"**Original Abstract:** {abstract}")
+            with st.expander(f"📄 {title}", expanded=True):
+                placeholder = st.empty()
+                if entry is not None:
+                    placeholder.markdown(f"**Summary:** {entry['summary']}")
+                else:
+                    placeholder.info("No precomputed summary yet; generating one...")
+                    streams[i] = [placeholder, ""]
+                    worker.submit(paper, h, query.strip() if fast else None, events, i)
+                st.markdown("---")
+                st.markdown(f"**Original Abstract:** {abstract}")
 
+        # stored summaries are already on screen; stream the rest as tokens arrive
+        # (only this script thread may touch the page, so workers report through the queue)
+        while streams:
+            key, item = events.get()
+            if key not in streams:
+                continue
+            if isinstance(item, str):
+                streams[key][1] += item
+                streams[key][0].markdown(f"**Summary:** {streams[key][1]}▌")
+                continue
+            placeholder = streams.pop(key)[0]
+            try:
+                placeholder.markdown(f"**Summary:** {item.result()}")
+            except Exception as e:
+                placeholder.error(f"Summary generation failed: {e}")
@@ -0,0 +1,64 @@
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.text_clean import clean_batch, clean_text
+
+STRUCTURED_FILE = "data/structured_data.json"
+
+
+def legacy_cleanup_data(text: str):
+    """The original per-call cleanup from utils/fetch.py, kept as the baseline."""
+    text = text.replace("−", "-")
+    text = text.encode('utf-8').decode('unicode_escape')
+    text = text.replace('\\', '')
+    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(r'^\s*\d+(\.\d+)*\s*\.?\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\n\s*\n', '\n', text).strip()
+    text = re.sub(r"\(Fig\.[^)]*\)", "", text)
+    text = re.sub(r"\(Table[^)]*\)", "", text)
+    text = re.sub(r"Refer to Fig\.[^\s.]*\.?", "", text)
+    text = re.sub(r"\(for full review see[^)]*\)", "", text, flags=re.IGNORECASE)
+    return text
+
+
+def load_passages(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    passages = []
+    for paper in data:
+        for section in paper.values():
+            passages.extend(t for t in section.values() if t)
+    return passages
+
+
+def bench(name, fn, passages):
+    start = time.perf_counter()
+    fn(passages)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {len(passages) / elapsed:>12,.0f} passages/s  ({elapsed:.3f}s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark passage cleaning throughput.")
+    parser.add_argument("--input", default=STRUCTURED_FILE)
+    parser.add_argument("--repeat", type=int, default=200, help="replicate the passages to get a stable timing")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    passages = load_passages(args.input) * args.repeat
+    print(f"{len(passages)} passages, {sum(map(len, passages)) / 1e6:.1f}M chars")
+
+    base = bench("legacy cleanup_data", lambda ps: [legacy_cleanup_data(p) for p in ps], passages)
+    single = bench("clean_text", lambda ps: [clean_text(p) for p in ps], passages)
+    pooled = bench("clean_batch (process pool)", lambda ps: clean_batch(ps, workers=args.workers), passages)
+    print(f"speedup: {base / single:.1f}x single-process, {base / pooled:.1f}x pooled")
+
+
+if __name__ == "__main__":
+    main()
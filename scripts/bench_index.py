@@ -0,0 +1,85 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.ann_index import INDEX_TYPES, build_index, index_memory_bytes
+from utils.chunk_store import CHUNK_DIR
+from utils.embedding_cache import EmbeddingCache
+from utils.inference import embedder_id
+from utils.paper_search import EMBED_MODEL
+
+
+def load_vectors(source):
+    if source == "chunks":
+        return np.asarray(np.load(Path(CHUNK_DIR) / "vectors.npy"), dtype=np.float32)
+    cache = EmbeddingCache(embedder_id(EMBED_MODEL))
+    if not len(cache):
+        raise SystemExit("No cached paper embeddings; run scripts/semantic-searching.py first.")
+    return np.asarray(cache.vectors, dtype=np.float32)
+
+
+def parse_params(values):
+    params = {}
+    for kv in values:
+        index_type, _, rest = kv.partition(":")
+        key, _, value = rest.partition("=")
+        params.setdefault(index_type, {})[key] = int(value) if value.isdigit() else value
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FAISS index types: recall@k vs flat, latency, memory.")
+    parser.add_argument("--source", choices=["papers", "chunks"], default="papers")
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--param", action="append", default=[], metavar="TYPE:KEY=VALUE",
+                        help="override a parameter, e.g. hnsw:ef_search=128 (repeatable)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(1)  # single-query latency, as in the apps
+    vectors = load_vectors(args.source)
+    rng = np.random.default_rng(args.seed)
+    # queries: corpus vectors with a little noise, re-normalized
+    queries = vectors[rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)]
+    queries = queries + rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    ids = np.arange(len(vectors), dtype=np.int64)
+    overrides = parse_params(args.param)
+
+    print(f"{len(vectors)} vectors (dim {vectors.shape[1]}), {len(queries)} queries, k={args.k}")
+    print(f"{'type':<10}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}{'memory MB':>12}{'build s':>10}  params")
+
+    truth = None
+    for index_type in ["flat"] + [t for t in args.types if t != "flat"]:
+        start = time.perf_counter()
+        index, params = build_index(vectors, index_type, overrides.get(index_type))
+        index.add_with_ids(vectors, ids)
+        build_s = time.perf_counter() - start
+
+        latencies = np.empty(len(queries))
+        found = np.empty((len(queries), args.k), dtype=np.int64)
+        for i, q in enumerate(queries):
+            t0 = time.perf_counter()
+            _, I = index.search(q[None, :], args.k)
+            latencies[i] = (time.perf_counter() - t0) * 1000
+            found[i] = I[0]
+
+        if truth is None:
+            truth = found
+        recall = np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth)])
+        if index_type not in args.types:
+            continue
+        shown = {k: v for k, v in params.items() if k != "type"}
+        print(f"{index_type:<10}{recall:>10.3f}{np.percentile(latencies, 50):>10.3f}"
+              f"{np.percentile(latencies, 99):>10.3f}{index_memory_bytes(index) / 1e6:>12.2f}{build_s:>10.2f}  {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import gc
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import evaluate
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.corpus import PAPERS_FILE, iter_papers
+from utils.inference import BACKENDS, load_embedder, load_seq2seq
+from utils.paper_search import EMBED_MODEL
+from utils.summarization import SUMMARY_MODEL, build_input_text, summarize_batch
+
+QUERIES = ["plant growth microgravity", "radiation DNA damage", "bone loss astronaut",
+           "immune response spaceflight", "muscle atrophy mice", "Arabidopsis root gravitropism"]
+
+
+def rss_mb():
+    """Resident memory of this process (Linux)."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def bench_embedder(backends, texts, repeat):
+    print(f"\n== Embedding model {EMBED_MODEL}: {len(texts)} passages, {len(QUERIES) * repeat} single queries")
+    print(f"{'backend':<8} {'load MB':>8} {'passages/s':>11} {'query p50 ms':>13} {'p99 ms':>8} "
+          f"{'cos vs torch':>13} {'min cos':>8}")
+    for backend in backends:
+        gc.collect()
+        before = rss_mb()
+        model = load_embedder(EMBED_MODEL, backend)
+        loaded = rss_mb() - before
+
+        model.encode(texts[:8], normalize_embeddings=True)  # warm-up
+        start = time.perf_counter()
+        vecs = model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+        throughput = len(texts) / (time.perf_counter() - start)
+        latencies = []
+        for _ in range(repeat):
+            for q in QUERIES:
+                start = time.perf_counter()
+                model.encode([q], normalize_embeddings=True)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        if backend == "torch":
+            reference = vecs
+        agreement = (vecs * reference).sum(axis=1)
+        print(f"{backend:<8} {loaded:>8.0f} {throughput:>11.1f} {statistics.median(latencies):>13.1f} "
+              f"{np.percentile(latencies, 99):>8.1f} {agreement.mean():>13.4f} {agreement.min():>8.4f}")
+        del model
+
+
+def bench_summarizer(backends, papers, max_input_tokens):
+    print(f"\n== Summarizer {SUMMARY_MODEL}: {len(papers)} papers, inputs truncated to {max_input_tokens} tokens")
+    print(f"{'backend':<8} {'load MB':>8} {'mean s':>8} {'p50 s':>8} {'rouge1':>8} {'rougeL':>8}")
+    rouge = evaluate.load("rouge")
+    texts = [build_input_text(p) for p in papers]
+    for backend in backends:
+        gc.collect()
+        before = rss_mb()
+        tokenizer, model, device = load_seq2seq(SUMMARY_MODEL, backend=backend)
+        loaded = rss_mb() - before
+
+        summaries, times = [], []
+        for text in texts:
+            start = time.perf_counter()
+            summaries.append(summarize_batch([text], tokenizer, model, device, max_length=max_input_tokens)[0])
+            times.append(time.perf_counter() - start)
+
+        if backend == "torch":
+            # summaries from the fp32 torch model are the reference
+            reference = summaries
+        scores = rouge.compute(predictions=summaries, references=reference)
+        print(f"{backend:<8} {loaded:>8.0f} {statistics.mean(times):>8.1f} {statistics.median(times):>8.1f} "
+              f"{scores['rouge1']:>8.3f} {scores['rougeL']:>8.3f}")
+        del model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inference backends: latency, memory and quality delta.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS),
+                        help="torch is always run first as the quality reference")
+    parser.add_argument("--part", choices=["embed", "summary", "both"], default="both")
+    parser.add_argument("--passages", type=int, default=512, help="passages to embed")
+    parser.add_argument("--repeat", type=int, default=10, help="passes over the single-query set")
+    parser.add_argument("--papers", type=int, default=3, help="papers to summarize")
+    parser.add_argument("--max-input-tokens", type=int, default=2048)
+    args = parser.parse_args()
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    if args.part in ("embed", "both"):
+        texts = []
+        for paper in iter_papers(PAPERS_FILE, fields=("title", "abstract")):
+            texts.extend(t for t in (paper.get("title"), paper.get("abstract")) if t)
+            if len(texts) >= args.passages:
+                break
+        bench_embedder(backends, texts[:args.passages], args.repeat)
+    if args.part in ("summary", "both"):
+        papers = list(iter_papers(PAPERS_FILE, fields=("pmcid", "title", "meta_title", "abstract", "results"),
+                                  limit=args.papers))
+        bench_summarizer(backends, papers, args.max_input_tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.search_client import SearchClient
+
+QUERIES = [
+    "plant growth microgravity",
+    "radiation DNA damage",
+    "bone loss astronaut",
+    "muscle atrophy spaceflight mice",
+    "immune system changes in space",
+    "Arabidopsis root gravitropism",
+    "oxidative stress cosmic radiation",
+    "cardiovascular deconditioning",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the search service with concurrent clients.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + args.seconds
+
+    def worker(n):
+        client = SearchClient(args.url)
+        i = n
+        local = []
+        while time.monotonic() < stop_at:
+            # vary the text so nothing upstream can serve a cached answer
+            query = f"{QUERIES[i % len(QUERIES)]} {i}"
+            t0 = time.perf_counter()
+            client.search(query, args.top_k)
+            local.append((time.perf_counter() - t0) * 1000)
+            i += args.clients
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.clients)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]
+    print(f"{len(latencies)} queries from {args.clients} clients in {elapsed:.1f}s: "
+          f"{len(latencies) / elapsed:.1f} q/s, p50 {pct(50):.1f} ms, p99 {pct(99):.1f} ms")
+    print("server:", SearchClient(args.url).stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import evaluate
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.corpus import PAPERS_FILE, iter_papers
+from utils.extractive import FAST_TOKEN_BUDGET, reduce_paper
+from utils.inference import load_embedder
+from utils.paper_search import EMBED_MODEL
+from utils.summarization import SUMMARY_MODEL, build_input_text, load_summarizer, summarize_batch, token_lengths
+
+
+def timed_summary(text, tokenizer, model, device):
+    start = time.perf_counter()
+    summary = summarize_batch([text], tokenizer, model, device)[0]
+    return summary, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full-input and fast (extractive) summarization.")
+    parser.add_argument("--limit", type=int, default=5, help="papers to summarize")
+    parser.add_argument("--budget", type=int, default=FAST_TOKEN_BUDGET)
+    parser.add_argument("--query", default=None, help="rank sentences by this query instead of the centroid")
+    parser.add_argument("--model", default=SUMMARY_MODEL)
+    args = parser.parse_args()
+
+    tokenizer, model, device = load_summarizer(args.model)
+    embedder = load_embedder(EMBED_MODEL)
+    papers = list(iter_papers(PAPERS_FILE, fields=("pmcid", "title", "meta_title", "abstract", "results"),
+                              limit=args.limit))
+
+    full_times, fast_times, reduce_times = [], [], []
+    full_summaries, fast_summaries, full_inputs, fast_inputs = [], [], [], []
+    for paper in papers:
+        full_text = build_input_text(paper)
+        start = time.perf_counter()
+        fast_text = reduce_paper(paper, embedder, tokenizer, args.budget, query=args.query)
+        reduce_times.append(time.perf_counter() - start)
+
+        summary, elapsed = timed_summary(full_text, tokenizer, model, device)
+        full_summaries.append(summary)
+        full_times.append(elapsed)
+        summary, elapsed = timed_summary(fast_text, tokenizer, model, device)
+        fast_summaries.append(summary)
+        fast_times.append(elapsed + reduce_times[-1])
+        full_inputs.append(full_text)
+        fast_inputs.append(fast_text)
+        print(f"{paper['pmcid']}: full {full_times[-1]:.1f}s, fast {fast_times[-1]:.1f}s")
+
+    full_tokens = token_lengths(full_inputs, tokenizer)
+    fast_tokens = token_lengths(fast_inputs, tokenizer)
+    # the full-input summary is the reference: how much of it does fast mode keep?
+    rouge = evaluate.load("rouge").compute(predictions=fast_summaries, references=full_summaries)
+
+    print(f"\n{len(papers)} papers, budget {args.budget} tokens, "
+          f"ranking by {'query' if args.query else 'centroid'}")
+    print(f"{'':<6} {'input tokens':>13} {'mean s':>8} {'p50 s':>8}")
+    print(f"{'full':<6} {statistics.mean(full_tokens):>13,.0f} {statistics.mean(full_times):>8.1f} "
+          f"{statistics.median(full_times):>8.1f}")
+    print(f"{'fast':<6} {statistics.mean(fast_tokens):>13,.0f} {statistics.mean(fast_times):>8.1f} "
+          f"{statistics.median(fast_times):>8.1f}  (extraction {statistics.mean(reduce_times):.2f}s)")
+    print(f"speedup: {sum(full_times) / sum(fast_times):.1f}x")
+    print("ROUGE of fast vs full-input summaries: "
+          + ", ".join(f"{k} {v:.3f}" for k, v in rouge.items() if k in ("rouge1", "rouge2", "rougeL")))
+
+
+if __name__ == "__main__":
+    main()
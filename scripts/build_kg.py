@@ -1,26 +1,29 @@
 
 
-from pyvis.network import Network
-import networkx as nx
 from pathlib import Path
+import argparse
 import json
+import sys
+import time
 
-def visualize_triplets(triplets, output_file):
-    G = nx.DiGraph()
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.kg_layout import LAYOUT_ITERATIONS, layout_graph
+from utils.kg_normalize import KG_GRAPH_FILE, KnowledgeGraphBuilder, save_graph
+from utils.kg_render import graph_network
+from utils.kg_store import KG_DIR, KGStore
+from utils.triplet_pipeline import TRIPLETS_FILE
 
-    for subj, pred, obj in triplets:
-        G.add_node(subj, title=subj)
-        G.add_node(obj, title=obj)
-        G.add_edge(subj, obj, label=pred)
+KG_HTML_FILE = "output/knowledge_graph.html"
 
-    net = Network(notebook=False, directed=True, height="750px", width="100%")
-    net.from_nx(G)
+def visualize_graph(entities, edges, output_file):
+    net = graph_network(entities, edges)
     net.write_html(output_file)
     print(f" Knowledge graph saved to {output_file}")
 
 def load_triplets_from_json(json_path):
     """
-    Load triplets from a JSON file (list of dicts with subject, predicate, object).
+    Load triplet records from a JSON file (list of dicts with subject,
+    relation and object, plus pmcid when the extractor recorded it).
     """
     path = Path(json_path)
     if not path.exists():
@@ -29,15 +32,36 @@ def load_triplets_from_json(json_path):
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    triplets = [(d["subject"], d["relation"], d["object"]) for d in data]
-    return triplets
+    return [d for d in data if d.get("subject") and (d.get("relation") or d.get("predicate")) and d.get("object")]
 
 
 
 if __name__ == "__main__":
-    json_path = "outputs/striplets-new.json"
-    output_file = "outputs/knowledge_graph.html"
+    parser = argparse.ArgumentParser(description="Render a triplets file as an interactive knowledge graph.")
+    parser.add_argument("--input", default=TRIPLETS_FILE,
+                        help="ontology.py output, or output/triplets-rules.json from extract_triplets.py")
+    parser.add_argument("--output", default=KG_HTML_FILE)
+    parser.add_argument("--graph", default=KG_GRAPH_FILE, help="where to save the normalized graph")
+    parser.add_argument("--store", default=KG_DIR, help="where to save the indexed graph store (utils/kg_store.py)")
+    parser.add_argument("--layout-iterations", type=int, default=LAYOUT_ITERATIONS,
+                        help="force-directed layout steps; 0 leaves the layout to vis.js physics in the browser")
+    args = parser.parse_args()
 
-    triplets = load_triplets_from_json(json_path)
+    triplets = load_triplets_from_json(args.input)
+    raw_nodes = len({t["subject"] for t in triplets} | {t["object"] for t in triplets})
 
-    visualize_triplets(triplets,output_file)
+    # canonicalize entities and merge duplicate edges before drawing anything
+    graph = KnowledgeGraphBuilder().add_records(triplets)
+    entities, edges = graph.entities(), graph.edges()
+    if args.layout_iterations > 0:
+        # fixed coordinates, so the page opens without a physics simulation
+        start = time.perf_counter()
+        layout_graph(entities, edges, iterations=args.layout_iterations)
+        print(f"Layout: {len({e['community'] for e in entities})} communities, "
+              f"{time.perf_counter() - start:.1f}s")
+    save_graph(entities, edges, args.graph)
+    KGStore.build(entities, edges).save(args.store)
+    print(f"{len(triplets)} triplets / {raw_nodes} raw entities -> {len(entities)} entities, {len(edges)} edges "
+          f"({graph.dropped} dropped)")
+
+    visualize_graph(entities, edges, args.output)
@@ -0,0 +1,38 @@
+import argparse
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+from tqdm import tqdm
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.corpus import STRUCTURED_FILE, iter_structured, write_json_array
+from utils.entity_index import ENTITY_INDEX_DIR, build_entity_index
+from utils.rule_triplets import RULE_TRIPLETS_FILE, extract_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule-based (offline) triplet extraction from the section hierarchy.")
+    parser.add_argument("--input", default=STRUCTURED_FILE)
+    parser.add_argument("--output", default=RULE_TRIPLETS_FILE)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N papers")
+    parser.add_argument("--entity-index", default=ENTITY_INDEX_DIR, help="where to save the entity -> paper index")
+    args = parser.parse_args()
+
+    papers = islice(iter_structured(args.input), args.limit)
+
+    start = time.time()
+    triplets, n_papers = [], 0
+    for records in tqdm(extract_corpus(papers, args.workers), desc="Extracting triplets", unit="paper"):
+        triplets.extend(records)
+        n_papers += 1
+
+    write_json_array(args.output, triplets, indent=2)
+    print(f"{len(triplets)} triplets from {n_papers} papers in {time.time() - start:.1f}s -> {args.output}")
+    build_entity_index(triplets, args.entity_index)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,29 @@
 
+import argparse
 import json
-from sentence_transformers import SentenceTransformer
+import os
+import sys
+from pathlib import Path
 import numpy as np
 import faiss
 from tqdm import tqdm
 
-PAPERS_FILE = "data/papers.json"
-FAISS_INDEX_FILE = "data/papers_index.faiss"
-META_FILE = "data/papers_meta.json"
-EMBED_MODEL = "all-MiniLM-L6-v2"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.ann_index import INDEX_TYPES, build_index, load_index, save_index
+from utils.bm25 import BM25_DIR, BM25Index
+from utils.chunk_store import CHUNK_DIR, CHUNK_INDEX_FILE, ChunkStoreWriter, iter_section_chunks
+from utils.corpus import PAPERS_FILE, STRUCTURED_FILE, batched, iter_papers, iter_structured
+from utils.embedding_cache import EmbeddingCache, text_hash
+from utils.inference import EMBED_BACKEND, embedder_id, load_embedder
+from utils.meta_store import META_DB_FILE, MetaStore
+from utils.paper_search import EMBED_MODEL, FAISS_INDEX_FILE
+
+# PMCID -> stable vector ID and corpus-text hash, used for incremental builds
+INDEX_STATE_FILE = "data/papers_index_state.json"
+# Papers are streamed through the encoder in batches of this size
+ENCODE_BATCH = 256
+# Embeddings (and the index state) are keyed by model and backend, e.g. "all-MiniLM-L6-v2@int8"
+EMBED_ID = embedder_id(EMBED_MODEL)
 def make_corpus_item(p):
     # Compose a single text block to encode
     parts = []
@@ -21,43 +36,201 @@ def make_corpus_item(p):
         parts.append(p["full_text"][:2000])
     return "\n\n".join(parts)
 
+def make_meta_item(p):
+    return {"pmcid": p.get("pmcid"), "title": p.get("title"), "meta_title": p.get("meta_title"),
+            "source_link": p.get("source_link"), "abstract": p.get("abstract"),
+            "results": p.get("results"), "conclusion": p.get("conclusion"),
+            "full_text_preview": (p.get("full_text") or "")[:2000]}
+
+def make_lexical_item(record):
+    # BM25 text: the displayed fields plus the PMCID in both spellings
+    parts = [record.get(k) or "" for k in ("title", "meta_title", "abstract", "results", "conclusion")]
+    if record.get("pmcid"):
+        parts.append(f"PMC{record['pmcid']} {record['pmcid']}")
+    return "\n".join(parts)
+
+def load_state():
+    if not (os.path.exists(INDEX_STATE_FILE) and os.path.exists(FAISS_INDEX_FILE) and os.path.exists(META_DB_FILE)):
+        return None
+    with open(INDEX_STATE_FILE, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("embed_model") != EMBED_ID:
+        return None
+    return state
+
+def save_state(state):
+    tmp = INDEX_STATE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, INDEX_STATE_FILE)
+
+def build_chunk_index(model):
+    """
+    Passage-level index: one vector per section (or window of a long section)
+    from the structured hierarchy, stored compactly as float16 with integer
+    paper/section/text offsets (see utils/chunk_store.py).
+    """
+    cache = EmbeddingCache(EMBED_ID, root=os.path.join(CHUNK_DIR, "cache"))
+    writer = ChunkStoreWriter(CHUNK_DIR)
+    index = None
+    keep = set()
+
+    for pmcid, grouped in tqdm(iter_structured(STRUCTURED_FILE), desc="Chunking papers", unit="paper"):
+        chunks = list(iter_section_chunks(grouped))
+        if not chunks:
+            continue
+        sections, texts = zip(*chunks)
+        embeddings = cache.encode(list(texts), model)
+        keep.update(text_hash(t) for t in texts)
+        writer.add(pmcid, sections, texts, embeddings)
+        if index is None:
+            index = faiss.IndexScalarQuantizer(embeddings.shape[1], faiss.ScalarQuantizer.QT_fp16,
+                                               faiss.METRIC_INNER_PRODUCT)
+        index.add(embeddings)
+
+    writer.close()
+    if index is None:
+        print("No sections found in", STRUCTURED_FILE)
+        return
+    faiss.write_index(index, os.path.join(CHUNK_DIR, CHUNK_INDEX_FILE))
+    cache.prune(keep)
+    cache.save()
+    print(f"Indexed {index.ntotal} chunks from {len(writer.papers)} papers into {CHUNK_DIR}.")
+
 def main():
-    with open(PAPERS_FILE, "r", encoding="utf-8") as f:
-        papers = json.load(f)
+    parser = argparse.ArgumentParser(description="Build or incrementally update the paper FAISS index.")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the existing index and rebuild from scratch")
+    parser.add_argument("--chunks", action="store_true", help="build the passage-level chunk index instead")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=None,
+                        help="FAISS index type (default: keep the current one, else flat)")
+    parser.add_argument("--index-param", action="append", default=[], metavar="KEY=VALUE",
+                        help="build/search parameter, e.g. M=32, nlist=256, nprobe=16 (repeatable)")
+    args = parser.parse_args()
 
-    if not papers:
-        print("No papers found in", PAPERS_FILE)
+    print(f"Loading embedding model: {EMBED_MODEL} ({EMBED_BACKEND} backend)")
+    model = load_embedder(EMBED_MODEL)
+    if args.chunks:
+        build_chunk_index(model)
         return
+    cache = EmbeddingCache(EMBED_ID)
+
+    index_params = {k: int(v) if v.isdigit() else v for k, v in (kv.split("=", 1) for kv in args.index_param)}
 
-    print(f"Loaded {len(papers)} papers.")
+    state = None if args.rebuild else load_state()
+    # Vector IDs are stable per PMCID; the meta store keeps each paper under its ID
+    meta = MetaStore(META_DB_FILE)
+    if state is not None:
+        index, stored_params = load_index(FAISS_INDEX_FILE)
+        index_type = args.index_type or stored_params.get("type", "flat")
+        if index.ntotal:
+            # an interrupted run may have saved the index but not the state: never reuse its IDs
+            max_id = int(faiss.vector_to_array(index.id_map).max())
+            state["next_id"] = max(state["next_id"], max_id + 1)
+        print(f"Updating existing index ({index.ntotal} vectors).")
+    else:
+        index = None
+        stored_params = None
+        index_type = args.index_type or "flat"
+        meta.clear()
+        state = {"embed_model": EMBED_ID, "next_id": 0, "papers": {}}
+        print("Building a new index.")
 
-    corpus = [make_corpus_item(p) for p in papers]
+    # The flat index is updated in place. ANN indexes (HNSW cannot remove
+    # vectors, IVF centroids go stale) are rebuilt from cached embeddings.
+    stored_type = stored_params.get("type", "flat") if stored_params else "flat"
+    incremental = index_type == "flat" and stored_type == "flat" and not index_params
+    if not incremental:
+        index = None
+    known = state["papers"]
+    seen = set()
+    added = updated = unchanged = 0
 
-    print("Loading embedding model:", EMBED_MODEL)
-    model = SentenceTransformer(EMBED_MODEL)
+    progress = tqdm(desc="Scanning papers", unit="paper")
+    # Stream the corpus: only ENCODE_BATCH papers are held in memory at once
+    for batch in batched(iter_papers(PAPERS_FILE), ENCODE_BATCH):
+        changed = []
+        records = []
+        for p in batch:
+            text = make_corpus_item(p)
+            h = text_hash(text)
+            key = str(p.get("pmcid") or h)
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = known.get(key)
+            if entry is None:
+                entry = known[key] = {"id": state["next_id"], "hash": None}
+                state["next_id"] += 1
+                added += 1
+            elif entry["hash"] == h:
+                unchanged += 1
+            else:
+                updated += 1
+            if entry["hash"] != h:
+                changed.append((entry, text, h))
+            # meta is cheap to refresh even when the embedded text is unchanged
+            records.append((entry["id"], make_meta_item(p)))
+        meta.upsert_many(records)
 
-    print("Computing embeddings...")
-    embeddings = model.encode(corpus, show_progress_bar=True, convert_to_numpy=True, normalize_embeddings=True)
+        if not incremental:
+            # make sure every current paper has a cached embedding for the rebuild
+            cache.encode([make_corpus_item(p) for p in batch], model)
+            for entry, _, h in changed:
+                entry["hash"] = h
+        elif changed:
+            embeddings = cache.encode([text for _, text, _ in changed], model)
+            ids = np.array([entry["id"] for entry, _, _ in changed], dtype=np.int64)
+            if index is None:
+                print("Embedding dim:", embeddings.shape[1])
+                # cosine via normalized vectors => inner product; IDMap2 keeps PMCID-stable ids
+                index = faiss.IndexIDMap2(faiss.IndexFlatIP(embeddings.shape[1]))
+            stale = np.array([entry["id"] for entry, _, _ in changed if entry["hash"] is not None], dtype=np.int64)
+            if len(stale):
+                index.remove_ids(stale)
+            index.add_with_ids(embeddings, ids)
+            for entry, _, h in changed:
+                entry["hash"] = h
+        progress.update(len(batch))
+    progress.close()
 
-    d = embeddings.shape[1]
-    print("Embedding dim:", d)
+    deleted = [key for key in known if key not in seen]
+    if deleted and incremental and index is not None:
+        index.remove_ids(np.array([known[key]["id"] for key in deleted], dtype=np.int64))
+    meta.delete(known.pop(key)["id"] for key in deleted)
+
+    if not known:
+        print("No papers found in", PAPERS_FILE)
+        return
 
-    # Build FAISS index
-    index = faiss.IndexFlatIP(d)  # cosine via normalized vectors => inner product
-    index.add(embeddings)
-    faiss.write_index(index, FAISS_INDEX_FILE)
-    print("Saved FAISS index to", FAISS_INDEX_FILE)
+    if incremental:
+        params = {"type": "flat"}
+    else:
+        ids = np.array([entry["id"] for entry in known.values()], dtype=np.int64)
+        vectors = np.stack([cache.get(entry["hash"]) for entry in known.values()])
+        if stored_params and stored_type == index_type:
+            # same index type: keep the stored ANN settings unless overridden on the command line
+            index_params = {**{k: v for k, v in stored_params.items() if k != "type"}, **index_params}
+        print(f"Building {index_type} index over {len(ids)} vectors...")
+        index, params = build_index(vectors, index_type, index_params)
+        index.add_with_ids(vectors, ids)
 
-    # Save meta (we will keep the original paper dict and the corpus text)
-    meta = [{"pmcid": p.get("pmcid"), "title": p.get("title"), "meta_title": p.get("meta_title"),
-             "source_link": p.get("source_link"), "abstract": p.get("abstract"),
-             "results": p.get("results"), "conclusion": p.get("conclusion"),
-             "full_text_preview": (p.get("full_text") or "")[:2000]} for p in papers]
+    print(f"Added {added}, updated {updated}, unchanged {unchanged}, deleted {len(deleted)} papers.")
+    print(f"Embedding cache: {cache.hits} hits, {cache.misses} encoded.")
 
-    with open(META_FILE, "w", encoding="utf-8") as f:
-        json.dump(meta, f, indent=2, ensure_ascii=False)
+    save_index(index, FAISS_INDEX_FILE, params)
+    print(f"Saved {params['type']} FAISS index to", FAISS_INDEX_FILE)
+    meta.commit()
+    print("Saved metadata to", META_DB_FILE)
+    # the state must match the saved index before anything slower runs
+    save_state(state)
 
-    print("Saved metadata to", META_FILE)
+    # BM25 postings over the same row IDs, rebuilt from the meta store (cheap)
+    bm25 = BM25Index.build((row_id, make_lexical_item(record)) for row_id, record in meta.iter_items())
+    bm25.save(BM25_DIR)
+    meta.close()
+    print(f"Saved BM25 index ({len(bm25.vocab)} terms) to", BM25_DIR)
+    cache.prune({entry["hash"] for entry in known.values()})
+    cache.save()
     print("Index build done.")
 
 if __name__ == "__main__":
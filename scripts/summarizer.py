@@ -1,53 +1,154 @@
-import json
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from tqdm import tqdm
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+
 import torch
+from tqdm import tqdm
+from transformers import AutoTokenizer
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.corpus import PAPERS_FILE, iter_papers
+from utils.extractive import FAST_TOKEN_BUDGET, reduce_paper
+from utils.inference import load_embedder
+from utils.paper_search import EMBED_MODEL
+from utils.summarization import (SUMMARY_MODEL, build_input_text, length_buckets, load_summarizer,
+                                 summarize_batch, token_lengths)
+from utils.summary_store import SUMMARIES_FILE, SummaryStore, input_hash
+
+BATCH_SIZE = 4
+# Cap on padded tokens per generate() call (batch size x longest input in the batch)
+MAX_BATCH_TOKENS = 32000
+
+
+def pending_papers(store, model_name, limit=None, fast=False):
+    """
+    (pmcid, title, input_text, input_hash) for papers without a summary of
+    their current input. Streamed (greedy) summaries from the summary app
+    are always redone; a fast run also counts fast summaries as current.
+    """
+    todo, skipped = [], 0
+    fields = ("pmcid", "title", "meta_title", "abstract", "results")
+    for paper in iter_papers(PAPERS_FILE, fields=fields, limit=limit):
+        text = build_input_text(paper)
+        h = input_hash(text, model_name)
+        if store.is_current(paper["pmcid"], h, allow_fast=fast):
+            skipped += 1
+            continue
+        todo.append((paper, text, h))
+    return todo, skipped
+
+
+def reduce_inputs(todo, tokenizer, budget):
+    """Fast mode: replace each input with its centroid-ranked extract of at most `budget` tokens."""
+    embedder = load_embedder(EMBED_MODEL)
+    return [(paper, reduce_paper(paper, embedder, tokenizer, budget), h)
+            for paper, _, h in tqdm(todo, desc="Extracting sentences")]
+
+
+def plan_batches(todo, tokenizer, batch_size, max_batch_tokens):
+    items = [(paper["pmcid"], paper.get("title") or "", text, h) for paper, text, h in todo]
+    lengths = token_lengths([text for _, _, text, _ in items], tokenizer)
+    return [[items[i] for i in bucket] for bucket in length_buckets(lengths, batch_size, max_batch_tokens)]
+
+
+def run_batches(batches, tokenizer, model, device):
+    """Yield [(pmcid, title, summary, input_hash)] per finished batch."""
+    for batch in batches:
+        summaries = summarize_batch([text for _, _, text, _ in batch], tokenizer, model, device)
+        yield [(pmcid, title, summary, h) for (pmcid, title, _, h), summary in zip(batch, summaries)]
+
+
+def shard_worker(batches, model_name, threads, results):
+    torch.set_num_threads(threads)
+    try:
+        tokenizer, model, device = load_summarizer(model_name)
+        for finished in run_batches(batches, tokenizer, model, device):
+            results.put(finished)
+    finally:
+        results.put(None)
+
+
+def run_sharded(batches, model_name, shards):
+    """
+    Spread batches round-robin over `shards` processes, each with its own
+    model copy and an equal share of the CPU threads. Results come back to
+    this process, which stays the only writer of the summary file.
+    """
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    threads = max(1, (os.cpu_count() or 1) // shards)
+    procs = [ctx.Process(target=shard_worker, args=(batches[i::shards], model_name, threads, results))
+             for i in range(shards)]
+    for p in procs:
+        p.start()
+    running = len(procs)
+    while running:
+        try:
+            finished = results.get(timeout=10)
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs):
+                break
+            continue
+        if finished is None:
+            running -= 1
+        else:
+            yield finished
+    for p in procs:
+        p.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the corpus in length-bucketed, checkpointed batches.")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N papers")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-batch-tokens", type=int, default=MAX_BATCH_TOKENS)
+    parser.add_argument("--shards", type=int, default=1, help="worker processes, each with its own model")
+    parser.add_argument("--fast", action="store_true",
+                        help="summarize an extract of the most central sentences instead of the full input")
+    parser.add_argument("--fast-budget", type=int, default=FAST_TOKEN_BUDGET, help="token budget in fast mode")
+    parser.add_argument("--model", default=SUMMARY_MODEL)
+    parser.add_argument("--output", default=SUMMARIES_FILE)
+    args = parser.parse_args()
+
+    store = SummaryStore(args.output)
+    todo, skipped = pending_papers(store, args.model, args.limit, args.fast)
+    print(f"{skipped} papers already summarized with unchanged input, {len(todo)} to go")
+    if not todo:
+        return
+
+    if args.shards > 1:
+        tokenizer = AutoTokenizer.from_pretrained(args.model)
+    else:
+        tokenizer, model, device = load_summarizer(args.model)
+    if args.fast:
+        todo = reduce_inputs(todo, tokenizer, args.fast_budget)
+    batches = plan_batches(todo, tokenizer, args.batch_size, args.max_batch_tokens)
+    print(f"{len(batches)} length-bucketed batches across {args.shards} shard(s)")
+
+    if args.shards > 1:
+        results = run_sharded(batches, args.model, args.shards)
+    else:
+        results = run_batches(batches, tokenizer, model, device)
+
+    start, done = time.time(), 0
+    with tqdm(total=len(todo), desc="Summarizing papers") as bar:
+        for finished in results:
+            for pmcid, title, summary, h in finished:
+                store.put(pmcid, title, summary, h, args.model, "fast" if args.fast else "full")
+            # checkpoint after every batch so an interrupted run resumes here
+            store.save()
+            done += len(finished)
+            bar.update(len(finished))
+            bar.set_postfix(papers_per_min=f"{done / (time.time() - start) * 60:.1f}")
+
+    elapsed = time.time() - start
+    print(f"Summarized {done}/{len(todo)} papers in {elapsed:.0f}s "
+          f"({done / max(elapsed, 1e-9) * 60:.1f} papers/min) -> {args.output}")
+
 
-# Load model and tokenizer
-model_name = "allenai/led-large-16384-arxiv"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model.to(device)
-
-# Load your data (example: papers.json)
-with open("data/papers.json", "r", encoding="utf-8") as f:
-    papers = json.load(f)
-
-papers = papers[:10]
-summaries = []
-
-for paper in tqdm(papers, desc="Summarizing papers"):
-    title = paper.get("title", "")
-    abstract = paper.get("abstract", "")
-    results = paper.get("results", "")
-
-    input_text = f"Title: {title}\n\nAbstract: {abstract}\n\nResults: {results}"
-    
-    # Tokenize input
-    inputs = tokenizer(
-        input_text,
-        return_tensors="pt",
-        max_length=16000,
-        truncation=True
-    ).to(device)
-    
-    # Generate summary
-    summary_ids = model.generate(
-        **inputs,
-        max_length=512,
-        num_beams=4,
-        length_penalty=2.0,
-        early_stopping=True
-    )
-
-    summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-    summaries.append({
-        "pmcid": paper["pmcid"],
-        "title": title,
-        "summary": summary
-    })
-
-# Save summaries
-with open("data/summaries.json", "w", encoding="utf-8") as f:
-    json.dump(summaries, f, indent=2)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# tests import the repo's modules as utils.*, like the scripts do
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from utils.ann_index import build_index, load_index, save_index
+
+
+def unit_vectors(n, d=32, seed=0):
+    v = np.random.default_rng(seed).normal(size=(n, d)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def search_self(index, vectors, k=1):
+    index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64) * 10)
+    _, ids = index.search(vectors[:5], k)
+    return ids[:, 0].tolist()
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_flat", "ivf_pq"])
+def test_every_type_finds_its_own_vectors(index_type):
+    vectors = unit_vectors(400)
+    index, params = build_index(vectors, index_type, {"nprobe": 64} if index_type.startswith("ivf") else None)
+    assert params["type"] == index_type
+    assert search_self(index, vectors) == [0, 10, 20, 30, 40]
+
+
+def test_ivf_pq_clamps_nbits_and_nlist_on_small_corpora():
+    vectors = unit_vectors(100)
+    index, params = build_index(vectors, "ivf_pq", {"nlist": 500, "nprobe": 100})
+    assert params["type"] == "ivf_pq"
+    assert params["nbits"] == 6 and params["nlist"] == 100
+    assert search_self(index, vectors) == [0, 10, 20, 30, 40]
+
+
+def test_ivf_pq_falls_back_to_flat_on_tiny_corpora():
+    vectors = unit_vectors(8)
+    index, params = build_index(vectors, "ivf_pq")
+    assert params == {"type": "flat"}
+    assert search_self(index, vectors) == [0, 10, 20, 30, 40]
+
+
+def test_params_saved_next_to_index(tmp_path):
+    vectors = unit_vectors(200)
+    index, params = build_index(vectors, "hnsw", {"ef_search": 32})
+    path = str(tmp_path / "papers.faiss")
+    save_index(index, path, params)
+    _, loaded = load_index(path, ef_search=128)
+    assert loaded == {**params, "ef_search": 128}
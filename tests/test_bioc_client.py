@@ -0,0 +1,106 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import bioc_client
+from utils.bioc_client import TokenBucket, fetch_bioc_json, fetch_many
+
+BIOC = [{"documents": [{"passages": [{"text": "Bone loss", "infons": {"type": "title_1"}}]}]}]
+
+
+class StubBioC:
+    """Local BioC server: each PMCID answers with its scripted statuses in turn, then 200."""
+
+    def __init__(self):
+        self.script = {}
+        self.requests = []  # (pmcid, arrival time)
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                pmcid = re.search(r"/PMC(\d+)/unicode$", self.path).group(1)
+                with stub._lock:
+                    stub.requests.append((pmcid, time.monotonic()))
+                    queue = stub.script.get(pmcid, [])
+                    status, headers = queue.pop(0) if queue else (200, {})
+                body = json.dumps(BIOC).encode() if status == 200 else b"error"
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/BioC_json"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def count(self, pmcid):
+        return sum(1 for p, _ in self.requests if p == pmcid)
+
+
+@pytest.fixture
+def stub():
+    server = StubBioC()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff sleeps instead of waiting them out."""
+    delays = []
+    monkeypatch.setattr(bioc_client.time, "sleep", delays.append)
+    return delays
+
+
+def test_retries_429_and_5xx_with_backoff(stub, sleeps):
+    stub.script["1"] = [(503, {}), (500, {}), (429, {"Retry-After": "2"})]
+    assert fetch_bioc_json("PMC1", base_url=stub.base_url) == BIOC
+    assert stub.count("1") == 4
+    # exponential backoff with jitter, then the server's Retry-After
+    base = bioc_client.BACKOFF_BASE
+    assert base / 2 <= sleeps[0] <= base
+    assert base <= sleeps[1] <= base * 2
+    assert sleeps[2] == 2.0
+
+
+def test_gives_up_after_max_retries(stub, sleeps):
+    stub.script["2"] = [(503, {})] * 10
+    assert fetch_bioc_json("2", base_url=stub.base_url, max_retries=2) is None
+    assert stub.count("2") == 3
+    assert len(sleeps) == 2
+
+
+def test_not_found_returns_none_without_retrying(stub, sleeps):
+    stub.script["3"] = [(404, {})]
+    assert fetch_bioc_json("3", base_url=stub.base_url) is None
+    assert stub.count("3") == 1
+    assert sleeps == []
+
+
+def test_token_bucket_spaces_requests(stub):
+    rate, n = 20.0, 8
+    limiter = TokenBucket(rate, capacity=1)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda i: fetch_bioc_json(i, limiter=limiter, base_url=stub.base_url), range(n)))
+    assert results == [BIOC] * n
+    arrivals = sorted(t for _, t in stub.requests)
+    # the first token is free, every later request waits 1 / rate for its own
+    assert arrivals[-1] - arrivals[0] >= (n - 1) / rate * 0.9
+
+
+def test_fetch_many_fetches_every_pmcid(stub, sleeps):
+    stub.script["11"] = [(404, {})]
+    results = dict(fetch_many(["10", "11", "12"], concurrency=2, rate=100, base_url=stub.base_url))
+    assert results == {"10": BIOC, "11": None, "12": BIOC}
@@ -0,0 +1,100 @@
+from utils.bioc_parser import parse_bioc, parse_bioc_batch
+from utils.text_clean import clean_batch, clean_text
+
+
+def passage(text, section_type="", type_="paragraph"):
+    return {"text": text, "infons": {"section_type": section_type, "type": type_}}
+
+
+def bioc(*passages):
+    return [{"documents": [{"passages": list(passages)}]}]
+
+
+def test_sections_routed_by_section_type():
+    parsed = parse_bioc(bioc(
+        passage("Spaceflight and bone", "TITLE", "front"),
+        passage("We studied mice.", "ABSTRACT", "abstract"),
+        passage("Bone density fell.", "RESULTS"),
+        passage("Key findings here.", "FINDINGS"),
+        passage("Loss is reversible.", "DISCUSSION"),
+        passage("In summary, exercise helps.", "CONCLUSIONS"),
+        passage("Methods text.", "METHODS"),
+    ), pmcid="123")
+    sections = parsed["sections"]
+    assert sections["pmcid"] == "123"
+    assert sections["title"] == "Spaceflight and bone"
+    assert sections["abstract"] == "We studied mice."
+    assert sections["results"] == "Bone density fell. Key findings here."
+    assert sections["conclusion"] == "Loss is reversible. In summary, exercise helps."
+    assert "Methods text." in sections["full_text"]
+
+
+def test_only_first_title_is_kept():
+    parsed = parse_bioc(bioc(passage("Main title", "TITLE"), passage("Second heading", "TITLE")))
+    assert parsed["sections"]["title"] == "Main title"
+
+
+def test_empty_title_passage_leaves_title_unset():
+    parsed = parse_bioc(bioc(passage("", "TITLE"), passage("Real title", "TITLE"), passage("Text.", "ABSTRACT")))
+    assert parsed["sections"]["title"] == "Real title"
+    # no title at all: empty, so callers fall back to the CSV meta_title
+    parsed = parse_bioc(bioc(passage("  ", "TITLE"), passage("Text.", "ABSTRACT")))
+    assert parsed["sections"]["title"] == ""
+
+
+def test_title_falls_back_to_first_passage():
+    long_text = "Microgravity " * 40
+    parsed = parse_bioc(bioc(passage(long_text, "INTRO"), passage("More.", "INTRO")))
+    title = parsed["sections"]["title"]
+    assert title == long_text.strip()[:200]
+    assert len(title) <= 200
+
+
+def test_grouped_hierarchy():
+    parsed = parse_bioc(bioc(
+        passage("Orphan paragraph before any heading."),
+        passage("Results", type_="title_1"),
+        passage("Intro to results."),
+        passage("Bone", type_="title_2"),
+        passage("Bone fell."),
+        passage("Still bone."),
+        passage("Discussion", type_="title_1"),
+        passage("We discuss."),
+    ))
+    assert parsed["grouped"] == {
+        "Results": {"main_content": "Intro to results.", "Bone": "Bone fell. Still bone."},
+        "Discussion": {"main_content": "We discuss."},
+    }
+
+
+def test_passages_are_cleaned_once():
+    calls = []
+
+    def clean(text):
+        calls.append(text)
+        return text.upper()
+
+    parsed = parse_bioc(bioc(passage("a", "ABSTRACT"), passage("b", "RESULTS")), clean=clean)
+    assert calls == ["a", "b"]
+    assert parsed["sections"]["abstract"] == "A"
+
+
+def test_malformed_responses_return_none():
+    assert parse_bioc([]) is None
+    assert parse_bioc(None) is None
+    assert parse_bioc([{"documents": []}]) is None
+    assert parse_bioc(bioc()) is None
+
+
+def test_clean_batch_matches_clean_text():
+    texts = ["2.1. Bone  loss (Fig. 1A)", "gravity\u00e2\u0080\u0094a factor", ""] * 400
+    assert clean_batch(texts, workers=2, chunksize=100) == [clean_text(t) for t in texts]
+
+
+def test_parse_bioc_batch_matches_parse_bioc():
+    papers = [
+        ("1", bioc(passage("Bone  loss", "TITLE"), passage("Results", type_="title_1"), passage("1. Bone fell."))),
+        ("2", []),
+        ("3", bioc(passage("Root growth (Fig. 2)", "ABSTRACT"))),
+    ]
+    assert parse_bioc_batch(papers, workers=1) == [parse_bioc(bio, pmcid) for pmcid, bio in papers]
@@ -0,0 +1,64 @@
+import math
+
+import numpy as np
+
+from utils.bm25 import BM25Index, is_lexical_query, rrf_fuse, tokenize
+
+DOCS = [
+    (10, "Microgravity induces bone loss in mice"),
+    (20, "Bone density after spaceflight on the ISS"),
+    (30, "Arabidopsis root growth in microgravity"),
+    (40, "STS-131 mission plant experiments"),
+]
+
+
+def test_tokenize_drops_stopwords_and_splits_hyphens():
+    assert tokenize("The STS-131 mission of NASA") == ["sts-131", "sts", "131", "mission", "nasa"]
+
+
+def test_search_returns_row_ids_best_first():
+    index = BM25Index.build(DOCS)
+    hits = index.search("bone loss", top_k=10)
+    assert [row for row, _ in hits] == [10, 20]
+    assert hits[0][1] > hits[1][1] > 0
+    assert index.search("unrelated words") == []
+
+
+def test_score_matches_bm25_formula():
+    index = BM25Index.build(DOCS)
+    n, df, k1, b = 4, 2, index.k1, index.b
+    doc_len = len(tokenize(DOCS[0][1]))
+    avgdl = np.mean([len(tokenize(t)) for _, t in DOCS])
+    idf = math.log1p((n - df + 0.5) / (df + 0.5))
+    expected = idf * (k1 + 1) / (1 + k1 * (1 - b + b * doc_len / avgdl))
+    (row, score), = [h for h in index.search("bone") if h[0] == 10]
+    assert math.isclose(score, expected, rel_tol=1e-5)
+
+
+def test_hyphenated_identifier_matches_split_query():
+    index = BM25Index.build(DOCS)
+    assert index.search("sts 131")[0][0] == 40
+    assert index.search("STS-131")[0][0] == 40
+
+
+def test_save_load_round_trip(tmp_path):
+    index = BM25Index.build(DOCS)
+    index.save(tmp_path)
+    loaded = BM25Index.load(tmp_path)
+    assert loaded.search("microgravity") == index.search("microgravity")
+
+
+def test_rrf_fuse_rewards_agreement():
+    dense = [(1, 0.9), (2, 0.8), (3, 0.7)]
+    lexical = [(3, 12.0), (1, 8.0), (4, 1.0)]
+    fused = rrf_fuse([dense, lexical], k=60, top_k=3)
+    assert [row for row, _ in fused] == [1, 3, 2]
+    assert math.isclose(fused[0][1], 1 / 61 + 1 / 62)
+
+
+def test_is_lexical_query():
+    assert is_lexical_query("Cdkn1a Nfe2l2")
+    assert is_lexical_query("PMC1234567")
+    assert is_lexical_query("STS-131")
+    assert not is_lexical_query("bone loss in astronauts")
+    assert not is_lexical_query("")
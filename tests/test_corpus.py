@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from utils.corpus import JsonlWriter, iter_jsonl, iter_structured, write_json_array
+
+
+def write_jsonl(path, records):
+    with JsonlWriter(path) as w:
+        for record in records:
+            w.write(record)
+    return w.count
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = tmp_path / "papers.jsonl"
+    records = [{"pmcid": "1", "title": "Bone loss"}, {"pmcid": "2", "title": "Root growth μg"}]
+    assert write_jsonl(path, records) == 2
+    assert list(iter_jsonl(path)) == records
+    assert not (tmp_path / "papers.jsonl.tmp").exists()
+
+
+def test_jsonl_writer_keeps_old_file_on_exception(tmp_path):
+    path = tmp_path / "papers.jsonl"
+    write_jsonl(path, [{"pmcid": "old"}])
+    with pytest.raises(RuntimeError):
+        with JsonlWriter(path) as w:
+            w.write({"pmcid": "new"})
+            raise RuntimeError("interrupted")
+    assert list(iter_jsonl(path)) == [{"pmcid": "old"}]
+    assert not (tmp_path / "papers.jsonl.tmp").exists()
+
+
+def test_jsonl_writer_no_file_on_first_failed_run(tmp_path):
+    path = tmp_path / "sub" / "papers.jsonl"
+    with pytest.raises(ValueError):
+        with JsonlWriter(path):
+            raise ValueError
+    assert not path.exists()
+
+
+def test_iter_jsonl_skips_blank_lines(tmp_path):
+    path = tmp_path / "p.jsonl"
+    path.write_text('{"a": 1}\n\n  \n{"a": 2}\n', encoding="utf-8")
+    assert [r["a"] for r in iter_jsonl(path)] == [1, 2]
+
+
+def test_write_json_array_streams_valid_json(tmp_path):
+    path = tmp_path / "papers.json"
+    assert write_json_array(path, ({"i": i} for i in range(3))) == 3
+    assert json.loads(path.read_text(encoding="utf-8")) == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert write_json_array(path, iter(())) == 0
+    assert json.loads(path.read_text(encoding="utf-8")) == []
+    nested = tmp_path / "out" / "triplets.json"
+    assert write_json_array(nested, [{"subject": "a"}], indent=2) == 1
+    assert json.loads(nested.read_text(encoding="utf-8")) == [{"subject": "a"}]
+    assert not (tmp_path / "out" / "triplets.json.tmp").exists()
+
+
+def test_iter_structured_cleans_legacy_array(tmp_path):
+    path = tmp_path / "structured_data.json"
+    raw = "reduction in gravity\u00e2\u0080\u0094a factor (Fig. 1A)"
+    path.write_text(json.dumps([{"Introduction": {"main_content": raw}}]), encoding="utf-8")
+    assert list(iter_structured(path)) == [("paper-0", {"Introduction": {"main_content": "reduction in gravity\u2014a factor"}})]
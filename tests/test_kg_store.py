@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pytest
+
+from utils.kg_normalize import KnowledgeGraphBuilder, save_graph
+from utils.kg_store import KGStore, load_kg
+
+TRIPLETS = [
+    {"subject": "Microgravity", "relation": "reduces", "object": "bone density", "pmcid": "PMC1"},
+    {"subject": "microgravity", "relation": "reduces", "object": "Bone densities", "pmcid": "PMC2"},
+    {"subject": "Microgravity", "relation": "alters", "object": "T cells", "pmcid": "PMC2"},
+    {"subject": "T cell", "relation": "were associated with", "object": "immune response", "pmcid": "PMC3"},
+    {"subject": "immune response", "relation": "involves", "object": "cytokines"},
+    {"subject": "Radiation", "relation": "causes", "object": "DNA damage", "pmcid": "PMC4"},
+]
+
+
+@pytest.fixture
+def graph():
+    builder = KnowledgeGraphBuilder().add_records(TRIPLETS)
+    return builder.entities(), builder.edges()
+
+
+@pytest.fixture
+def kg(graph):
+    return KGStore.build(*graph)
+
+
+def ids(kg, *names):
+    return [kg.entity_id(n) for n in names]
+
+
+def test_entities_are_normalized_and_edges_merged(kg):
+    assert len(kg) == 7
+    assert kg.num_edges == 5
+    mg, bone = ids(kg, "microgravity", "the bone density")
+    (edge,) = [kg.edge(e) for e in kg.out_edge_ids(mg) if kg.target[e] == bone]
+    assert edge == {"source": mg, "relation": "reduces", "target": bone, "support": 2, "pmcids": ["PMC1", "PMC2"]}
+
+
+def test_save_load_round_trip(kg, tmp_path):
+    kg.save(tmp_path)
+    loaded = KGStore.load(tmp_path)
+    assert loaded.labels == kg.labels
+    assert loaded.index == kg.index
+    assert [loaded.edge(e) for e in range(loaded.num_edges)] == [kg.edge(e) for e in range(kg.num_edges)]
+    assert isinstance(loaded.source, np.memmap)
+    np.testing.assert_array_equal(loaded.degree, kg.degree)
+
+
+def test_neighbors_by_direction(kg):
+    mg, bone, cells = ids(kg, "Microgravity", "bone density", "T cells")
+    assert sorted(kg.neighbors(mg, "out").tolist()) == sorted([bone, cells])
+    assert kg.neighbors(mg, "in").tolist() == []
+    assert kg.neighbors(cells, "both").tolist() == sorted([mg, kg.entity_id("immune response")])
+
+
+def test_k_hop_subgraph(kg):
+    mg, bone, cells, immune, cytokines = ids(kg, "Microgravity", "bone density", "T cells", "immune response",
+                                             "cytokines")
+    nodes, edges = kg.subgraph([mg], hops=1)
+    assert set(nodes.tolist()) == {mg, bone, cells}
+    assert len(edges) == 2
+
+    nodes, edges = kg.subgraph([mg], hops=2)
+    assert set(nodes.tolist()) == {mg, bone, cells, immune}
+    nodes, _ = kg.subgraph([mg], hops=3)
+    assert cytokines in nodes.tolist()
+    assert kg.entity_id("Radiation") not in nodes.tolist()
+    # every returned edge stays inside the node set
+    for e in edges:
+        assert kg.source[e] in nodes and kg.target[e] in nodes
+
+
+def test_subgraph_node_budget_keeps_highest_support(kg):
+    mg, bone = ids(kg, "Microgravity", "bone density")
+    nodes, edges = kg.subgraph([mg], hops=2, max_nodes=2, rank="support")
+    assert nodes.tolist() == [mg, bone]
+    assert [kg.edge(e)["relation"] for e in edges] == ["reduces"]
+
+
+def test_shortest_path_and_top_degree(kg):
+    mg, cytokines, radiation = ids(kg, "Microgravity", "cytokines", "Radiation")
+    path = kg.shortest_path(mg, cytokines)
+    assert [kg.labels[i] for i in path] == ["Microgravity", "T cells", "immune response", "cytokines"]
+    assert kg.shortest_path(mg, radiation) is None
+    assert kg.shortest_path(mg, cytokines, max_hops=2) is None
+    # ties keep the lower ID
+    assert kg.top_degree(1) == [(mg, 2)]
+
+
+def test_find_puts_exact_match_first(kg):
+    assert kg.find("T cell")[0] == kg.entity_id("T cells")
+    assert kg.find("nothing like this") == []
+
+
+def test_load_kg_rebuilds_when_graph_is_newer(graph, tmp_path):
+    graph_file, root = tmp_path / "graph.json", tmp_path / "kg"
+    save_graph(*graph, graph_file)
+    first = load_kg(root, graph_file)
+    assert (root / "graph.json").exists()
+    assert len(load_kg(root, graph_file)) == len(first)
+
+    entities, edges = graph
+    save_graph(entities + [{"id": len(entities), "label": "apoptosis", "mentions": 1}], edges, graph_file)
+    later = os.stat(root / "graph.json").st_mtime + 10
+    os.utime(graph_file, (later, later))
+    assert len(load_kg(root, graph_file)) == len(first) + 1
@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.micro_batch import MicroBatcher
+
+
+class Recorder:
+    """Batch function that records the batches it saw."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return [x * 2 for x in items]
+
+
+def test_flushes_when_batch_is_full():
+    fn = Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=4, max_wait_ms=10_000)
+    try:
+        start = time.monotonic()
+        futures = [batcher.submit(i) for i in range(8)]
+        assert [f.result(timeout=5) for f in futures] == [i * 2 for i in range(8)]
+        # two full batches, long before the 10 s wait would have expired
+        assert time.monotonic() - start < 5
+        assert fn.batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    finally:
+        batcher.close()
+
+
+def test_flushes_partial_batch_after_timeout():
+    fn = Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=100, max_wait_ms=50)
+    try:
+        start = time.monotonic()
+        futures = [batcher.submit(i) for i in range(3)]
+        assert [f.result(timeout=5) for f in futures] == [0, 2, 4]
+        assert time.monotonic() - start >= 0.04
+        assert fn.batches == [[0, 1, 2]]
+        assert batcher.stats()["avg_batch_size"] == 3
+    finally:
+        batcher.close()
+
+
+def test_concurrent_callers_get_their_own_results():
+    fn = Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=8, max_wait_ms=20)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda i: batcher(i, timeout=5), range(64)))
+        assert results == [i * 2 for i in range(64)]
+        assert all(len(b) <= 8 for b in fn.batches)
+        assert batcher.stats()["items"] == 64
+    finally:
+        batcher.close()
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def fail(items):
+        raise ValueError("model crashed")
+
+    batcher = MicroBatcher(fail, max_batch_size=2, max_wait_ms=10_000)
+    try:
+        futures = [batcher.submit(i) for i in range(2)]
+        for f in futures:
+            with pytest.raises(ValueError):
+                f.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_submit_after_close_raises():
+    batcher = MicroBatcher(lambda items: items)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
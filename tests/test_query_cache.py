@@ -0,0 +1,111 @@
+import numpy as np
+
+from utils.query_cache import SemanticQueryCache, normalize_query
+
+A = np.array([1.0, 0.0], dtype=np.float32)
+NEAR_A = np.array([0.999, 0.0447], dtype=np.float32)
+B = np.array([0.0, 1.0], dtype=np.float32)
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_query():
+    assert normalize_query("  Bone LOSS, in mice? ") == "bone loss in mice"
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = SemanticQueryCache()
+    cache.put("Bone loss", A, ["r1"])
+    assert cache.get("bone  loss!") == ["r1"]
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_namespaces_are_separate():
+    cache = SemanticQueryCache()
+    cache.put("bone loss", A, ["top5"], namespace=5)
+    assert cache.get("bone loss", namespace=10) is None
+    assert cache.lookup("bone loss", namespace=10, encode=lambda: A) == (None, A)
+    assert cache.get("bone loss", namespace=5) == ["top5"]
+
+
+def test_similar_query_above_threshold():
+    cache = SemanticQueryCache(similarity=0.97)
+    cache.put("bone loss", A, ["r1"])
+    assert cache.get("loss of bone") is None
+    assert cache.lookup("loss of bone", encode=lambda: NEAR_A) == (["r1"], NEAR_A)
+    assert cache.lookup("something else", encode=lambda: B) == (None, B)
+
+
+def test_encode_only_called_on_exact_miss():
+    cache = SemanticQueryCache()
+    cache.put("bone loss", A, ["r1"])
+    calls = []
+
+    def encode():
+        calls.append(1)
+        return A
+
+    assert cache.lookup("Bone loss", encode=encode) == (["r1"], None)
+    assert calls == []
+    assert cache.lookup("bone loss in mice", encode=encode)[0] == ["r1"]
+    assert calls == [1]
+
+
+def test_every_query_counted_once():
+    cache = SemanticQueryCache()
+    cache.put("bone loss", A, ["r1"])
+    cache.lookup("bone loss", encode=lambda: A)                   # exact hit
+    cache.lookup("loss of bone", encode=lambda: NEAR_A)           # semantic hit
+    cache.lookup("sts-131")                                       # lexical / thin-client miss
+    cache.lookup("plants", encode=lambda: B)                      # dense miss
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["semantic_hits"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_entries_without_vectors_only_match_exactly():
+    cache = SemanticQueryCache()
+    cache.put("Cdkn1a", None, ["lexical"])
+    assert cache.get("cdkn1a") == ["lexical"]
+    assert cache.lookup("cdkn1b", encode=lambda: A) == (None, A)
+
+
+def test_ttl_expiry(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("utils.query_cache.time.time", clock)
+    cache = SemanticQueryCache(ttl_seconds=60)
+    cache.put("bone loss", A, ["r1"])
+    clock.now += 59
+    assert cache.get("bone loss") == ["r1"]
+    clock.now += 2
+    assert cache.get("bone loss") is None
+    assert cache.lookup("loss of bone", encode=lambda: A)[0] is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = SemanticQueryCache(max_entries=2)
+    cache.put("a", None, [1])
+    cache.put("b", None, [2])
+    cache.get("a")           # a is now the most recently used
+    cache.put("c", None, [3])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1]
+    assert cache.get("c") == [3]
+
+
+def test_validate_drops_entries_when_index_changes():
+    cache = SemanticQueryCache()
+    cache.validate(("index", 1))
+    cache.put("bone loss", A, ["r1"])
+    cache.validate(("index", 1))
+    assert cache.get("bone loss") == ["r1"]
+    cache.validate(("index", 2))
+    assert cache.get("bone loss") is None
+    assert cache.stats()["invalidations"] == 1
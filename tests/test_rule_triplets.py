@@ -0,0 +1,30 @@
+import pytest
+
+from utils.rule_triplets import extract_paper, extract_sentence
+
+
+@pytest.mark.parametrize("sentence, expected", [
+    # "-ed" forms after to/and/or that start a noun phrase are adjectives, not verbs
+    ("This effect is linked to increased expression of the Fas receptor", []),
+    ("Cells demonstrate decreased proliferation and increased apoptosis", []),
+    ("Microgravity leads to reduced bone density", [("Microgravity", "leads to", "reduced bone density")]),
+    ("Cancer cells show outcomes such as reduced proliferation or increased invasiveness", []),
+    # ... but a coordinated verb still shares the subject
+    ("Microgravity reduced bone density and increased bone resorption",
+     [("Microgravity", "reduces", "bone density"), ("Microgravity", "increases", "bone resorption")]),
+    ("Spaceflight showed reduced activity", []),
+    ("Radiation has been shown to induce DNA damage", [("Radiation", "induces", "DNA damage")]),
+    ("Bone loss is induced by microgravity", [("microgravity", "induces", "Bone loss")]),
+    ("Genes were downregulated", []),
+    ("Spaceflight causes an increase in oxidative stress", []),
+])
+def test_extract_sentence(sentence, expected):
+    assert extract_sentence(sentence) == expected
+
+
+def test_extract_paper_records_pmcid_and_section():
+    grouped = {"Results": {"main_content": "Microgravity induces bone loss. Nothing else happens here."}}
+    assert extract_paper(("PMC1", grouped)) == [
+        {"subject": "Microgravity", "relation": "induces", "object": "bone loss", "pmcid": "PMC1",
+         "section": "Results"},
+    ]
@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from utils.entity_index import EntityIndex
+from utils.triplet_pipeline import parse_triplets
+
+ONTOLOGY = Path(__file__).resolve().parents[1] / "scripts" / "ontology.py"
+PAPERS = [
+    {"pmcid": "101", "grouped": {"Introduction": {"main_content": "Microgravity induces bone loss in mice."},
+                                 "Results": {"main_content": "Osteoclast activity increased.",
+                                             "Bone": "Trabecular bone volume fell by a third."}}},
+    {"pmcid": "102", "grouped": {"Abstract": {"main_content": "Spaceflight alters root growth in Arabidopsis."}}},
+]
+
+
+def run_stub(tmp_path):
+    return subprocess.run(
+        [sys.executable, str(ONTOLOGY), "--backend", "stub", "--input", str(tmp_path / "structured.jsonl"),
+         "--output", str(tmp_path / "triplets.json"), "--entity-index", str(tmp_path / "entity_index"),
+         "--cache-dir", str(tmp_path / "cache")],
+        cwd=tmp_path, capture_output=True, text=True, check=True,
+    ).stdout
+
+
+def test_stub_backend_runs_extract_merge_validate(tmp_path):
+    (tmp_path / "structured.jsonl").write_text("".join(json.dumps(p) + "\n" for p in PAPERS), encoding="utf-8")
+    out = run_stub(tmp_path)
+    assert "4 triplets saved" in out and "0 failed" in out
+
+    triplets = json.loads((tmp_path / "triplets.json").read_text(encoding="utf-8"))
+    # one stub triplet per section chunk, merged in corpus order with provenance
+    assert [(t["pmcid"], t["section"]) for t in triplets] == [
+        ("101", "Introduction"), ("101", "Results"), ("101", "Results / Bone"), ("102", "Abstract")]
+    assert parse_triplets(json.dumps(triplets)) == [
+        {k: t[k] for k in ("subject", "relation", "object")} for t in triplets]
+    assert triplets[0]["object"] == "Microgravity induces bone loss in mice."
+
+    index = EntityIndex.load(tmp_path / "entity_index")
+    assert index.papers_for("Introduction") == [("101", 1, ["Introduction"])]
+    # nothing is written outside the given paths
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cache", "entity_index", "structured.jsonl", "triplets.json"]
+
+    # a second run answers every chunk from the cache
+    assert "4 chunks from cache, 0 extracted" in run_stub(tmp_path)
+
+
+def test_stub_backend_defaults_leave_real_outputs_alone(tmp_path):
+    (tmp_path / "structured.jsonl").write_text(json.dumps(PAPERS[1]) + "\n", encoding="utf-8")
+    subprocess.run([sys.executable, str(ONTOLOGY), "--backend", "stub", "--input", "structured.jsonl",
+                    "--cache-dir", "cache"], cwd=tmp_path, capture_output=True, check=True)
+    assert (tmp_path / "output" / "triplets-stub.json").exists()
+    assert (tmp_path / "data" / "entity_index-stub" / "entities.json").exists()
+    assert not (tmp_path / "output" / "triplets-new.json").exists()
+    assert not (tmp_path / "data" / "entity_index").exists()
@@ -0,0 +1,104 @@
+import json
+import os
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+# Build/search parameters per index type; anything passed in overrides these.
+DEFAULT_PARAMS = {
+    "flat": {},
+    "hnsw": {"M": 32, "ef_construction": 200, "ef_search": 64},
+    "ivf_flat": {"nlist": None, "nprobe": 16},
+    "ivf_pq": {"nlist": None, "nprobe": 16, "m": 16, "nbits": 8},
+}
+# Each PQ codebook has 2**nbits centroids and needs at least that many
+# training vectors; below 2**MIN_PQ_NBITS vectors ivf_pq falls back to flat.
+MIN_PQ_NBITS = 4
+
+
+def params_path(index_path):
+    return f"{index_path}.params.json"
+
+
+def _nlist(n, requested):
+    # ~sqrt(n) lists, but keep at least ~39 training points per list;
+    # k-means cannot train more lists than there are vectors
+    if requested:
+        return max(1, min(int(requested), n))
+    return max(1, min(int(4 * np.sqrt(n)), n // 39 or 1))
+
+
+def build_index(vectors, index_type="flat", params=None):
+    """
+    Build an inner-product FAISS index over normalized `vectors` wrapped in an
+    IDMap2, so callers keep using add_with_ids with their own IDs.
+    Returns (index, params) where params are the effective build parameters.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}, expected one of {INDEX_TYPES}")
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if index_type == "ivf_pq" and len(vectors) < 2 ** MIN_PQ_NBITS:
+        print(f"Warning: {len(vectors)} vectors are too few to train ivf_pq; building a flat index instead.")
+        index_type, params = "flat", None
+    params = {**DEFAULT_PARAMS[index_type], **(params or {})}
+    d = vectors.shape[1]
+
+    if index_type == "flat":
+        base = faiss.IndexFlatIP(d)
+    elif index_type == "hnsw":
+        base = faiss.IndexHNSWFlat(d, params["M"], faiss.METRIC_INNER_PRODUCT)
+        base.hnsw.efConstruction = params["ef_construction"]
+    else:
+        params["nlist"] = _nlist(len(vectors), params.get("nlist"))
+        quantizer = faiss.IndexFlatIP(d)
+        if index_type == "ivf_flat":
+            base = faiss.IndexIVFFlat(quantizer, d, params["nlist"], faiss.METRIC_INNER_PRODUCT)
+        else:
+            nbits = min(int(params["nbits"]), int(np.log2(len(vectors))))
+            if nbits < params["nbits"]:
+                print(f"Warning: nbits={params['nbits']} needs {2 ** params['nbits']} training vectors; "
+                      f"using nbits={nbits} for {len(vectors)}.")
+                params["nbits"] = nbits
+            base = faiss.IndexIVFPQ(quantizer, d, params["nlist"], params["m"], params["nbits"],
+                                    faiss.METRIC_INNER_PRODUCT)
+        base.train(vectors)
+
+    params["type"] = index_type
+    index = faiss.IndexIDMap2(base)
+    apply_search_params(index, params)
+    return index, params
+
+
+def apply_search_params(index, params):
+    base = faiss.downcast_index(index.index) if hasattr(index, "index") else index
+    if "ef_search" in params and hasattr(base, "hnsw"):
+        base.hnsw.efSearch = params["ef_search"]
+    if "nprobe" in params and hasattr(base, "nprobe"):
+        base.nprobe = params["nprobe"]
+
+
+def save_index(index, path, params):
+    faiss.write_index(index, path)
+    with open(params_path(path), "w", encoding="utf-8") as f:
+        json.dump(params, f, indent=2)
+
+
+def load_params(path):
+    if not os.path.exists(params_path(path)):
+        return {"type": "flat"}
+    with open(params_path(path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_index(path, **search_overrides):
+    """Read an index and apply the search parameters stored next to it."""
+    index = faiss.read_index(path)
+    params = {**load_params(path), **search_overrides}
+    apply_search_params(index, params)
+    return index, params
+
+
+def index_memory_bytes(index):
+    return int(faiss.serialize_index(index).nbytes)
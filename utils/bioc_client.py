@@ -0,0 +1,138 @@
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Point BIOC_BASE_URL at a local stub server to exercise the fetcher offline,
+# e.g. BIOC_BASE_URL=http://127.0.0.1:8000/BioC_json
+BIOC_BASE_URL = os.environ.get(
+    "BIOC_BASE_URL",
+    "https://www.ncbi.nlm.nih.gov/research/bionlp/RESTful/pmcoa.cgi/BioC_json",
+)
+
+# NCBI allows 3 requests/second without an API key and 10 with one.
+NCBI_API_KEY = os.environ.get("NCBI_API_KEY")
+DEFAULT_RATE = 10.0 if NCBI_API_KEY else 3.0
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 15
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def normalize_pmcid(pmcid):
+    """Return the numeric part of a PMCID ('PMC123' / '123' -> '123')."""
+    m = re.search(r"(\d+)", str(pmcid))
+    return m.group(1) if m else None
+
+
+def bioc_url(pmcid, base_url=None):
+    return f"{base_url or BIOC_BASE_URL}/PMC{normalize_pmcid(pmcid)}/unicode"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`.
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def make_session(pool_size=DEFAULT_CONCURRENCY):
+    """requests.Session with a keep-alive pool sized for the worker count."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _retry_delay(attempt, response=None):
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(BACKOFF_MAX, float(retry_after))
+    # exponential backoff with jitter
+    return min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+
+def fetch_bioc_json(pmcid, session=None, limiter=None, base_url=None,
+                    timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES):
+    """
+    Fetch the raw BioC JSON for one PMCID.
+    Retries with backoff on 429/5xx and connection errors; returns None on failure.
+    """
+    session = session or make_session(1)
+    url = bioc_url(pmcid, base_url)
+    params = {"api_key": NCBI_API_KEY} if NCBI_API_KEY else None
+
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            r = session.get(url, params=params, timeout=timeout)
+        except requests.RequestException as e:
+            if attempt == max_retries:
+                print(f"Error requesting {pmcid}: {e}")
+                return None
+            time.sleep(_retry_delay(attempt))
+            continue
+
+        if r.status_code in RETRY_STATUS and attempt < max_retries:
+            time.sleep(_retry_delay(attempt, r))
+            continue
+        if r.status_code != 200:
+            # Not found or blocked
+            return None
+
+        try:
+            return r.json()
+        except ValueError:
+            # Could be non-json or parse error
+            return None
+
+    return None
+
+
+def fetch_many(pmcids, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, base_url=None,
+               timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES):
+    """
+    Fetch BioC JSON for many PMCIDs over a shared keep-alive session.
+    Yields (pmcid, bioc_json_or_None) in completion order.
+    """
+    session = make_session(concurrency)
+    limiter = TokenBucket(rate)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {
+                pool.submit(fetch_bioc_json, pmcid, session, limiter, base_url, timeout, max_retries): pmcid
+                for pmcid in pmcids
+            }
+            for fut in as_completed(futures):
+                yield futures[fut], fut.result()
+    finally:
+        session.close()
@@ -0,0 +1,101 @@
+from utils.text_clean import clean_batch, clean_text
+
+SECTION_FIELDS = ("title", "abstract", "results", "conclusion")
+
+_RESULT_KEYS = ("results", "finding", "findings", "result")
+_CONCLUSION_KEYS = ("conclusion", "concluding", "discussion", "summary")
+
+
+def iter_passages(bio):
+    """Yield passages from the expected BioC structure: [0]["documents"][0]["passages"]."""
+    try:
+        docs = bio[0].get("documents", [])
+    except (IndexError, KeyError, AttributeError, TypeError):
+        return
+    if docs:
+        yield from docs[0].get("passages", []) or []
+
+
+def parse_bioc(bio, pmcid=None, clean=clean_text):
+    """
+    Walk the BioC passages once and build both downstream views:
+
+    - "sections": {pmcid, title, abstract, results, conclusion, full_text},
+      routed by infons["section_type"] (what papers.jsonl stores)
+    - "grouped": {level_1: {level_2 | "main_content": text}}, built from the
+      title_1 / title_2 / paragraph passage types (what structured_data stores)
+
+    Each passage is cleaned once and text is collected in lists that are
+    joined at the end, so the cost stays linear in the paper length.
+    Returns None when the response has no passages.
+    """
+    parts = {k: [] for k in SECTION_FIELDS}
+    full_text = []
+    first_text = None
+
+    grouped = {}
+    current_l1 = None
+    current_l2 = None
+
+    seen = False
+    for p in iter_passages(bio):
+        seen = True
+        infons = p.get("infons", {}) or {}
+        text = clean(p.get("text", "") or "")
+        if first_text is None:
+            first_text = text
+        full_text.append(text)
+
+        # section-typed record (robust to various tags)
+        section_type = (infons.get("section_type") or "").lower()
+        if ("title" in section_type or "heading" in section_type) and not parts["title"]:
+            if text:  # an empty title passage leaves the title unset
+                parts["title"].append(text)
+        elif "abstract" in section_type:
+            parts["abstract"].append(text)
+        elif any(k in section_type for k in _RESULT_KEYS):
+            parts["results"].append(text)
+        elif any(k in section_type for k in _CONCLUSION_KEYS):
+            parts["conclusion"].append(text)
+
+        # level_1 / level_2 hierarchy
+        t = infons.get("type")
+        if t == "title_1":
+            current_l1 = text
+            current_l2 = None
+            grouped.setdefault(current_l1, {})
+        elif t == "title_2":
+            if current_l1 is not None:
+                current_l2 = text
+                grouped[current_l1].setdefault(current_l2, [])
+        elif t == "paragraph" and current_l1 is not None and text:
+            grouped[current_l1].setdefault(current_l2 or "main_content", []).append(text)
+
+    if not seen:
+        return None
+
+    sections = {"pmcid": pmcid}
+    for k in SECTION_FIELDS:
+        sections[k] = " ".join(t for t in parts[k] if t).strip()
+    sections["full_text"] = "\n".join(full_text).strip()
+    # Fallbacks: if title empty, try first passage text
+    if not sections["title"] and first_text:
+        sections["title"] = first_text[:200]
+
+    grouped = {
+        l1: {l2: " ".join(texts) for l2, texts in subsections.items()}
+        for l1, subsections in grouped.items()
+    }
+    return {"sections": sections, "grouped": grouped}
+
+
+def parse_bioc_batch(items, workers=None):
+    """
+    parse_bioc for a list of (pmcid, bio) pairs, with the passages of all
+    papers cleaned in one clean_batch call (a process pool for large
+    batches). Returns the parsed results (or None) in input order.
+    """
+    texts = [p.get("text", "") or "" for _, bio in items for p in iter_passages(bio)]
+    cleaned = iter(clean_batch(texts, workers=workers))
+    # parse_bioc cleans every passage exactly once, in iter_passages order
+    return [parse_bioc(bio, pmcid, clean=lambda _: next(cleaned)) for pmcid, bio in items]
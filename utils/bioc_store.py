@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from utils.bioc_client import normalize_pmcid
+
+RAW_STORE_DIR = "data/raw_bioc"
+MANIFEST_FILE = "manifest.json"
+CHECKPOINT_EVERY = 25
+
+
+def _atomic_write(path, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class RawBioCStore:
+    """
+    Content-addressed on-disk cache of raw BioC JSON responses.
+
+    Blobs live under objects/<sha[:2]>/<sha>.json and manifest.json maps each
+    PMCID to {"sha256", "fetched_at"}. The manifest is checkpointed every
+    `checkpoint_every` puts so an interrupted run keeps what it downloaded.
+    """
+
+    def __init__(self, root=RAW_STORE_DIR, checkpoint_every=CHECKPOINT_EVERY):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root / MANIFEST_FILE
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+        self._dirty = 0
+        if self.manifest_path.exists():
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {}
+
+    def _blob_path(self, sha):
+        return self.objects / sha[:2] / f"{sha}.json"
+
+    def __contains__(self, pmcid):
+        return normalize_pmcid(pmcid) in self.manifest
+
+    def __len__(self):
+        return len(self.manifest)
+
+    def is_fresh(self, pmcid, max_age_days=None):
+        entry = self.manifest.get(normalize_pmcid(pmcid))
+        if entry is None or not self._blob_path(entry["sha256"]).exists():
+            return False
+        if max_age_days is None:
+            return True
+        return time.time() - entry["fetched_at"] < max_age_days * 86400
+
+    def missing(self, pmcids, max_age_days=None):
+        """PMCIDs that are not cached yet or older than max_age_days."""
+        return [p for p in pmcids if not self.is_fresh(p, max_age_days)]
+
+    def get(self, pmcid):
+        entry = self.manifest.get(normalize_pmcid(pmcid))
+        if entry is None:
+            return None
+        path = self._blob_path(entry["sha256"])
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, pmcid, bio):
+        data = json.dumps(bio, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(path, data)
+        with self._lock:
+            self.manifest[normalize_pmcid(pmcid)] = {"sha256": sha, "fetched_at": time.time()}
+            self._dirty += 1
+            if self._dirty >= self.checkpoint_every:
+                self._flush_locked()
+        return sha
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        data = json.dumps(self.manifest, indent=1, sort_keys=True).encode("utf-8")
+        _atomic_write(self.manifest_path, data)
+        self._dirty = 0
+
+    def items(self):
+        """Yield (pmcid, bioc_json) for every cached paper."""
+        for pmcid in list(self.manifest):
+            bio = self.get(pmcid)
+            if bio is not None:
+                yield pmcid, bio
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+BM25_DIR = "data/bm25"
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+# Keeps gene symbols (Nfe2l2, Cdkn1a), mission names (STS-131) and PMCIDs whole
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[-.][A-Za-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the to was were which with".split()
+)
+
+
+def tokenize(text):
+    tokens = []
+    for tok in _TOKEN_RE.findall(text or ""):
+        tok = tok.lower()
+        if tok not in _STOPWORDS:
+            tokens.append(tok)
+            if "-" in tok:
+                # also index the parts so "sts 131" still matches "STS-131"
+                tokens.extend(t for t in tok.split("-") if t)
+    return tokens
+
+
+_IDENTIFIER_RE = re.compile(
+    r"^(?:PMC\d+|\d+"                      # PMCIDs / bare numbers
+    r"|[A-Za-z]+-\d+[A-Za-z]*"              # STS-131, Bion-M1 style names
+    r"|[A-Za-z]*\d[A-Za-z0-9]*"             # alphanumerics: Cdkn1a, Nfe2l2, p53
+    r"|[A-Z][A-Z0-9]{1,}"                   # acronyms: ISS, DNA, NASA
+    r")$"
+)
+
+
+def is_lexical_query(query):
+    """
+    True when every term looks like an identifier (gene symbol, mission name,
+    PMCID, acronym): dense embeddings add little there, so BM25 alone is used.
+    """
+    terms = query.split()
+    return 0 < len(terms) <= 4 and all(_IDENTIFIER_RE.match(t.strip(".,;:()\"'")) for t in terms)
+
+
+class BM25Index:
+    """
+    In-process BM25 over compact postings arrays: a term -> id vocabulary,
+    int64 offsets into int32 doc-id and uint16 term-frequency arrays, and
+    int32 document lengths. Doc IDs are the same row IDs as the FAISS index.
+    """
+
+    def __init__(self, vocab, offsets, doc_ids, tfs, doc_ids_by_row, doc_len, k1=BM25_K1, b=BM25_B):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.row_ids = doc_ids_by_row  # internal doc -> external row ID
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+        n = len(doc_len)
+        self.avgdl = float(doc_len.mean()) if n else 0.0
+        df = np.diff(offsets)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self._norm = (k1 * (1 - b + b * doc_len / max(self.avgdl, 1e-9))).astype(np.float32)
+
+    @classmethod
+    def build(cls, docs):
+        """docs: iterable of (row_id, text)."""
+        vocab = {}
+        postings = []  # term id -> list of (doc, tf)
+        row_ids, doc_len = [], []
+        for doc, (row_id, text) in enumerate(docs):
+            counts = Counter(tokenize(text))
+            row_ids.append(row_id)
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                tid = vocab.get(term)
+                if tid is None:
+                    tid = vocab[term] = len(postings)
+                    postings.append([])
+                postings[tid].append((doc, min(tf, 65535)))
+
+        offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p) for p in postings])
+        doc_ids = np.empty(offsets[-1], dtype=np.int32)
+        tfs = np.empty(offsets[-1], dtype=np.uint16)
+        for tid, plist in enumerate(postings):
+            if plist:
+                arr = np.asarray(plist)
+                doc_ids[offsets[tid]:offsets[tid + 1]] = arr[:, 0]
+                tfs[offsets[tid]:offsets[tid + 1]] = arr[:, 1]
+        return cls(vocab, offsets, doc_ids, tfs, np.asarray(row_ids, dtype=np.int64),
+                   np.asarray(doc_len, dtype=np.int32))
+
+    def search(self, query, top_k=10):
+        """[(row_id, score)] best first."""
+        scores = np.zeros(len(self.doc_len), dtype=np.float32)
+        for term in set(tokenize(query)):
+            tid = self.vocab.get(term)
+            if tid is None:
+                continue
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            scores[docs] += self.idf[tid] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        hits = np.flatnonzero(scores)
+        if not len(hits):
+            return []
+        top = hits[np.argsort(-scores[hits], kind="stable")[:top_k]]
+        return [(int(self.row_ids[d]), float(scores[d])) for d in top]
+
+    def save(self, root=BM25_DIR):
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        np.save(root / "offsets.npy", self.offsets)
+        np.save(root / "doc_ids.npy", self.doc_ids)
+        np.save(root / "tfs.npy", self.tfs)
+        np.save(root / "row_ids.npy", self.row_ids)
+        np.save(root / "doc_len.npy", self.doc_len)
+        tmp = root / "vocab.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "vocab": self.vocab}, f)
+        os.replace(tmp, root / "vocab.json")
+
+    @classmethod
+    def load(cls, root=BM25_DIR):
+        root = Path(root)
+        with open(root / "vocab.json", "r", encoding="utf-8") as f:
+            header = json.load(f)
+        arrays = [np.load(root / f"{name}.npy", mmap_mode="r")
+                  for name in ("offsets", "doc_ids", "tfs", "row_ids", "doc_len")]
+        return cls(header["vocab"], *arrays, k1=header["k1"], b=header["b"])
+
+
+def rrf_fuse(rankings, k=RRF_K, top_k=10):
+    """Reciprocal rank fusion of several [(row_id, score)] lists -> [(row_id, fused score)]."""
+    fused = {}
+    for ranking in rankings:
+        for rank, (row_id, _) in enumerate(ranking):
+            fused[row_id] = fused.get(row_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
@@ -0,0 +1,144 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+CHUNK_DIR = "data/chunks"
+CHUNK_INDEX_FILE = "chunks.faiss"
+# MiniLM truncates at 256 word pieces; ~180 words stays under that.
+WINDOW_WORDS = 180
+WINDOW_OVERLAP = 40
+
+
+def iter_section_chunks(grouped, window_words=WINDOW_WORDS, overlap=WINDOW_OVERLAP):
+    """
+    Yield (section_label, text) windows for one paper's level_1/level_2
+    hierarchy. Short sections become one chunk; long ones are split into
+    overlapping word windows.
+    """
+    step = max(1, window_words - overlap)
+    for l1, subsections in grouped.items():
+        for l2, text in (subsections or {}).items():
+            if not text:
+                continue
+            label = l1 if l2 == "main_content" else f"{l1} / {l2}"
+            words = text.split()
+            if len(words) <= window_words:
+                yield label, text
+                continue
+            for start in range(0, len(words), step):
+                yield label, " ".join(words[start:start + window_words])
+                if start + window_words >= len(words):
+                    break
+
+
+class ChunkStoreWriter:
+    """
+    Accumulates chunks and writes the compact on-disk layout:
+    vectors.npy (float16), paper_ids.npy / section_ids.npy (int32),
+    text_offsets.npy (int64) into texts.bin, plus papers.json / sections.json.
+    """
+
+    def __init__(self, root=CHUNK_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._texts = open(self.root / "texts.bin.tmp", "wb")
+        self._offsets = [0]
+        self._vectors = []
+        self._paper_ids = []
+        self._section_ids = []
+        self.papers = []
+        self._paper_row = {}
+        self.sections = []
+        self._section_row = {}
+
+    def _intern(self, value, rows, table):
+        i = rows.get(value)
+        if i is None:
+            i = rows[value] = len(table)
+            table.append(value)
+        return i
+
+    def add(self, pmcid, sections, texts, vectors):
+        paper = self._intern(pmcid, self._paper_row, self.papers)
+        for section, text in zip(sections, texts):
+            data = text.encode("utf-8")
+            self._texts.write(data)
+            self._offsets.append(self._offsets[-1] + len(data))
+            self._paper_ids.append(paper)
+            self._section_ids.append(self._intern(section, self._section_row, self.sections))
+        self._vectors.append(np.asarray(vectors, dtype=np.float16))
+
+    def close(self):
+        self._texts.close()
+        os.replace(self.root / "texts.bin.tmp", self.root / "texts.bin")
+        vectors = np.concatenate(self._vectors) if self._vectors else np.zeros((0, 0), dtype=np.float16)
+        np.save(self.root / "vectors.npy", vectors)
+        np.save(self.root / "paper_ids.npy", np.asarray(self._paper_ids, dtype=np.int32))
+        np.save(self.root / "section_ids.npy", np.asarray(self._section_ids, dtype=np.int32))
+        np.save(self.root / "text_offsets.npy", np.asarray(self._offsets, dtype=np.int64))
+        with open(self.root / "papers.json", "w", encoding="utf-8") as f:
+            json.dump(self.papers, f)
+        with open(self.root / "sections.json", "w", encoding="utf-8") as f:
+            json.dump(self.sections, f, ensure_ascii=False)
+        return vectors
+
+
+class ChunkStore:
+    """Read side of the chunk store; arrays are memory-mapped and texts read on demand."""
+
+    def __init__(self, root=CHUNK_DIR):
+        self.root = Path(root)
+        self.paper_ids = np.load(self.root / "paper_ids.npy", mmap_mode="r")
+        self.section_ids = np.load(self.root / "section_ids.npy", mmap_mode="r")
+        self.offsets = np.load(self.root / "text_offsets.npy", mmap_mode="r")
+        with open(self.root / "papers.json", "r", encoding="utf-8") as f:
+            self.papers = json.load(f)
+        with open(self.root / "sections.json", "r", encoding="utf-8") as f:
+            self.sections = json.load(f)
+
+    def __len__(self):
+        return len(self.paper_ids)
+
+    def vectors(self):
+        return np.load(self.root / "vectors.npy", mmap_mode="r")
+
+    def text(self, chunk_id):
+        start, end = int(self.offsets[chunk_id]), int(self.offsets[chunk_id + 1])
+        with open(self.root / "texts.bin", "rb") as f:
+            f.seek(start)
+            return f.read(end - start).decode("utf-8")
+
+    def chunk(self, chunk_id):
+        return {
+            "pmcid": self.papers[self.paper_ids[chunk_id]],
+            "section": self.sections[self.section_ids[chunk_id]],
+            "text": self.text(chunk_id),
+        }
+
+
+def aggregate_hits(chunk_ids, scores, paper_ids, mode="max", top_k=5):
+    """
+    Fold chunk hits into paper hits. mode="max" scores a paper by its best
+    chunk, mode="sum" adds up all of its retrieved chunks.
+    Returns [(paper_row, score, best_chunk_id, best_chunk_score)], best first.
+    """
+    papers = {}
+    for cid, score in zip(chunk_ids, scores):
+        if cid < 0:
+            continue
+        paper = int(paper_ids[cid])
+        score = float(score)
+        hit = papers.get(paper)
+        if hit is None:
+            papers[paper] = [score, int(cid), score]
+            continue
+        if mode == "sum":
+            hit[0] += score
+        else:
+            hit[0] = max(hit[0], score)
+        if score > hit[2]:
+            hit[1], hit[2] = int(cid), score
+    ranked = sorted(papers.items(), key=lambda kv: kv[1][0], reverse=True)[:top_k]
+    return [(paper, s, cid, best) for paper, (s, cid, best) in ranked]
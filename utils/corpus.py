@@ -0,0 +1,132 @@
+import json
+import os
+from itertools import islice
+from pathlib import Path
+
+from utils.text_clean import clean_text
+
+# Line-delimited corpus: one paper per line, so readers can stream it.
+PAPERS_FILE = "data/papers.jsonl"
+# Older runs wrote a single JSON array; still readable (but not streamed).
+LEGACY_PAPERS_FILE = "data/papers.json"
+# Section hierarchy per paper: {"pmcid": ..., "grouped": {level_1: {level_2: text}}}
+STRUCTURED_FILE = "data/structured_data.jsonl"
+# Older format: a JSON array of grouped dicts without PMCIDs
+LEGACY_STRUCTURED_FILE = "data/structured_data.json"
+
+
+def iter_jsonl(path):
+    """Yield one dict per non-empty line of a JSONL file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class JsonlWriter:
+    """
+    Streaming JSONL writer. Records go to `<path>.tmp` and the file is moved
+    into place on a clean close, so readers never see a half-written corpus.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp_path = Path(f"{path}.tmp")
+        self.count = 0
+        self._f = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.tmp_path, "w", encoding="utf-8")
+        return self
+
+    def write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False))
+        self._f.write("\n")
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        self._f.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+        return False
+
+
+def write_json_array(path, records, indent=None):
+    """
+    Stream an iterable of dicts into a JSON array file without building the
+    list; written to `<path>.tmp` and moved into place like JsonlWriter.
+    Returns the record count.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.tmp"
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(record, ensure_ascii=False, indent=indent))
+            count += 1
+        f.write("\n]\n")
+    os.replace(tmp, path)
+    return count
+
+
+def resolve_papers_file(path=PAPERS_FILE):
+    """Fall back to the legacy papers.json when the JSONL corpus is not there yet."""
+    if not os.path.exists(path) and path == PAPERS_FILE and os.path.exists(LEGACY_PAPERS_FILE):
+        return LEGACY_PAPERS_FILE
+    return path
+
+
+def iter_papers(path=PAPERS_FILE, fields=None, limit=None):
+    """
+    Stream papers from the corpus. `fields` keeps only the listed keys so
+    callers that need a few fields don't hold every full_text in memory.
+    """
+    path = resolve_papers_file(path)
+    if str(path).endswith(".jsonl"):
+        papers = iter_jsonl(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            papers = iter(json.load(f))
+
+    if fields is not None:
+        papers = ({k: p.get(k) for k in fields} for p in papers)
+    if limit is not None:
+        papers = islice(papers, limit)
+    yield from papers
+
+
+def _clean_grouped(grouped):
+    return {k: _clean_grouped(v) if isinstance(v, dict) else clean_text(v) for k, v in grouped.items()}
+
+
+def iter_structured(path=STRUCTURED_FILE):
+    """
+    Yield (pmcid, grouped) pairs. The legacy structured_data.json carries no
+    PMCIDs, so those papers are keyed by position ("paper-<i>"); it was also
+    written before parse_bioc cleaned passages, so its text is cleaned here.
+    """
+    if not os.path.exists(path) and path == STRUCTURED_FILE and os.path.exists(LEGACY_STRUCTURED_FILE):
+        path = LEGACY_STRUCTURED_FILE
+    if str(path).endswith(".jsonl"):
+        for record in iter_jsonl(path):
+            yield record.get("pmcid"), record.get("grouped") or {}
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for i, grouped in enumerate(json.load(f)):
+                yield f"paper-{i}", _clean_grouped(grouped)
+
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items."""
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
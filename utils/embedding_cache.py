@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+EMBED_CACHE_DIR = "data/embeddings"
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent text-hash -> embedding cache, one directory per model:
+    vectors.npy (float32, row i) and keys.json (hash of row i).
+    encode() only runs the model on texts it has not seen before.
+    """
+
+    def __init__(self, model_name, root=EMBED_CACHE_DIR):
+        self.dir = Path(root) / re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.vectors_path = self.dir / "vectors.npy"
+        self.keys_path = self.dir / "keys.json"
+        self._keys = []
+        self._data = None
+        self._n = 0
+        if self.vectors_path.exists() and self.keys_path.exists():
+            with open(self.keys_path, "r", encoding="utf-8") as f:
+                self._keys = json.load(f)
+            self._data = np.load(self.vectors_path)
+            self._n = len(self._keys)
+        self._row = {k: i for i, k in enumerate(self._keys)}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self._n
+
+    def __contains__(self, key):
+        return key in self._row
+
+    @property
+    def vectors(self):
+        return self._data[:self._n] if self._data is not None else None
+
+    def get(self, key):
+        i = self._row.get(key)
+        return None if i is None else self._data[i]
+
+    def _append(self, keys, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._data is None:
+            self._data = np.empty((max(1024, len(keys)), vectors.shape[1]), dtype=np.float32)
+        if self._n + len(keys) > len(self._data):
+            grown = np.empty((max(self._n + len(keys), 2 * len(self._data)), self._data.shape[1]), dtype=np.float32)
+            grown[:self._n] = self._data[:self._n]
+            self._data = grown
+        self._data[self._n:self._n + len(keys)] = vectors
+        for k in keys:
+            self._row[k] = self._n
+            self._keys.append(k)
+            self._n += 1
+
+    def encode(self, texts, model, batch_size=64):
+        """Embeddings for `texts` (normalized, float32); only uncached texts are encoded."""
+        keys = [text_hash(t) for t in texts]
+        todo = {}
+        for k, t in zip(keys, texts):
+            if k not in self._row and k not in todo:
+                todo[k] = t
+        self.misses += len(todo)
+        self.hits += len(keys) - len(todo)
+        if todo:
+            vectors = model.encode(list(todo.values()), batch_size=batch_size,
+                                   convert_to_numpy=True, normalize_embeddings=True)
+            self._append(list(todo.keys()), vectors)
+        return self._data[[self._row[k] for k in keys]]
+
+    def prune(self, keep):
+        """Drop every entry whose key is not in `keep`."""
+        rows = [i for i, k in enumerate(self._keys) if k in keep]
+        if len(rows) == self._n:
+            return
+        self._keys = [self._keys[i] for i in rows]
+        self._data = self._data[rows] if rows else None
+        self._n = len(rows)
+        self._row = {k: i for i, k in enumerate(self._keys)}
+
+    def save(self):
+        if self._data is None:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / "vectors.tmp.npy"
+        np.save(tmp, self.vectors)
+        os.replace(tmp, self.vectors_path)
+        tmp = self.dir / "keys.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._keys, f)
+        os.replace(tmp, self.keys_path)
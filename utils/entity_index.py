@@ -0,0 +1,153 @@
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from utils.kg_normalize import clean_entity, entity_key
+
+ENTITY_INDEX_DIR = "data/entity_index"
+# Index of the offline stub backend's triplets, kept apart from the real one
+STUB_ENTITY_INDEX_DIR = "data/entity_index-stub"
+
+
+def _group(keys, columns, n):
+    """CSR offsets over `keys` (0..n-1) and each column reordered to match."""
+    order = np.lexsort((-columns[-1], keys))  # by key, then largest count first
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(keys, minlength=n))
+    return offsets, [c[order].astype(np.int32) for c in columns]
+
+
+class EntityIndex:
+    """
+    Inverted index from normalized entity (the same key as the knowledge
+    graph, so graph nodes and postings line up) to (pmcid, section)
+    postings with mention counts, plus the reverse paper -> entities
+    postings. Both are CSR arrays (int64 offsets, int32 columns) with the
+    entity, paper and section strings in a JSON header; a lookup is one
+    dict access and one array slice.
+    """
+
+    def __init__(self, keys, labels, papers, sections, offsets, post_paper, post_section, post_count,
+                 paper_offsets, paper_entity, paper_count):
+        self.keys = keys
+        self.labels = labels
+        self.papers = papers
+        self.sections = sections
+        self.offsets = offsets
+        self.post_paper = post_paper
+        self.post_section = post_section
+        self.post_count = post_count
+        self.paper_offsets = paper_offsets
+        self.paper_entity = paper_entity
+        self.paper_count = paper_count
+        self.entity_ids = {k: i for i, k in enumerate(keys)}
+        self.paper_ids = {p: i for i, p in enumerate(papers)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, records):
+        """records: triplet dicts with subject, object, pmcid and (optionally) section."""
+        keys, papers, sections, surface = {}, {}, {}, []
+        counts = Counter()  # (entity, paper, section) -> mentions
+        for r in records:
+            pmcid = r.get("pmcid")
+            if not pmcid:
+                continue
+            paper = papers.setdefault(str(pmcid), len(papers))
+            section = sections.setdefault(r.get("section") or "", len(sections))
+            for text in (r.get("subject"), r.get("object")):
+                label = clean_entity(text)
+                if not re.search(r"\w", label):
+                    continue
+                key = entity_key(label)
+                e = keys.get(key)
+                if e is None:
+                    e = keys[key] = len(surface)
+                    surface.append(Counter())
+                surface[e][label] += 1
+                counts[e, paper, section] += 1
+
+        labels = [forms.most_common(1)[0][0] for forms in surface]
+        triples = np.asarray([(e, p, s, c) for (e, p, s), c in counts.items()], dtype=np.int64).reshape(-1, 4)
+        offsets, (post_paper, post_section, post_count) = _group(
+            triples[:, 0], [triples[:, 1], triples[:, 2], triples[:, 3]], len(keys))
+
+        # reverse direction: mentions per (paper, entity), summed over sections
+        per_paper = Counter()
+        for (e, p, _), c in counts.items():
+            per_paper[p, e] += c
+        pairs = np.asarray([(p, e, c) for (p, e), c in per_paper.items()], dtype=np.int64).reshape(-1, 3)
+        paper_offsets, (paper_entity, paper_count) = _group(pairs[:, 0], [pairs[:, 1], pairs[:, 2]], len(papers))
+        return cls(list(keys), labels, list(papers), list(sections), offsets, post_paper, post_section, post_count,
+                   paper_offsets, paper_entity, paper_count)
+
+    @classmethod
+    def from_triplets_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.build(json.load(f))
+
+    _ARRAYS = ("offsets", "post_paper", "post_section", "post_count", "paper_offsets", "paper_entity", "paper_count")
+
+    def save(self, root=ENTITY_INDEX_DIR):
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        for name in self._ARRAYS:
+            np.save(root / f"{name}.npy", getattr(self, name))
+        tmp = root / "entities.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"keys": self.keys, "labels": self.labels, "papers": self.papers, "sections": self.sections},
+                      f, ensure_ascii=False)
+        os.replace(tmp, root / "entities.json")
+
+    @classmethod
+    def load(cls, root=ENTITY_INDEX_DIR):
+        root = Path(root)
+        with open(root / "entities.json", "r", encoding="utf-8") as f:
+            header = json.load(f)
+        arrays = [np.load(root / f"{name}.npy", mmap_mode="r") for name in cls._ARRAYS]
+        return cls(header["keys"], header["labels"], header["papers"], header["sections"], *arrays)
+
+    def entity_id(self, text):
+        return self.entity_ids.get(entity_key(clean_entity(text)))
+
+    def postings(self, text):
+        """[(pmcid, section, mentions)] for an entity, most mentions first."""
+        e = self.entity_id(text)
+        if e is None:
+            return []
+        start, end = self.offsets[e], self.offsets[e + 1]
+        return [(self.papers[p], self.sections[s], int(c)) for p, s, c in
+                zip(self.post_paper[start:end], self.post_section[start:end], self.post_count[start:end])]
+
+    def papers_for(self, text, limit=None):
+        """[(pmcid, mentions, [sections])] for an entity, most mentions first."""
+        papers = {}
+        for pmcid, section, count in self.postings(text):
+            entry = papers.setdefault(pmcid, [0, []])
+            entry[0] += count
+            entry[1].append(section)
+        ranked = sorted(papers.items(), key=lambda kv: -kv[1][0])[:limit]
+        return [(pmcid, count, sections) for pmcid, (count, sections) in ranked]
+
+    def entities_for(self, pmcid, limit=10):
+        """[(label, mentions)] for the entities extracted from one paper, most mentioned first."""
+        p = self.paper_ids.get(str(pmcid))
+        if p is None:
+            return []
+        start = self.paper_offsets[p]
+        end = min(self.paper_offsets[p + 1], start + limit)
+        return [(self.labels[e], int(c)) for e, c in zip(self.paper_entity[start:end], self.paper_count[start:end])]
+
+
+def build_entity_index(records, root=ENTITY_INDEX_DIR):
+    """Build and persist the index for freshly extracted triplet records; returns it."""
+    index = EntityIndex.build(records)
+    index.save(root)
+    print(f"Entity index: {len(index)} entities across {len(index.papers)} papers -> {root}")
+    return index
@@ -0,0 +1,62 @@
+import re
+
+import numpy as np
+
+# Input budget for fast mode, in summarizer tokens (LED-large is given up to 16000 in full mode)
+FAST_TOKEN_BUDGET = 1536
+
+# Sentence ends, except after common abbreviations (Fig., e.g., et al., ...)
+_SENTENCE_RE = re.compile(r"(?<!\bFig\.)(?<!\bFigs\.)(?<!\be\.g\.)(?<!\bi\.e\.)(?<!\bal\.)(?<!\bvs\.)"
+                          r"(?<=[.!?])\s+(?=[A-Z0-9(\[])")
+
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if s.strip()]
+
+
+def select_sentences(sent_vecs, lengths, budget, target=None):
+    """
+    Indices (in document order) of the sentences most similar to `target`
+    (default: the normalized centroid of all sentences) that fit in `budget`.
+    """
+    if target is None:
+        target = sent_vecs.mean(axis=0)
+    target = np.asarray(target, dtype=np.float32)
+    target = target / max(float(np.linalg.norm(target)), 1e-9)
+    keep, used = [], 0
+    for i in np.argsort(-(sent_vecs @ target), kind="stable"):
+        if used + lengths[i] <= budget:
+            keep.append(int(i))
+            used += lengths[i]
+    return sorted(keep)
+
+
+def reduce_paper(paper, embedder, tokenizer=None, budget=FAST_TOKEN_BUDGET, query=None):
+    """
+    Summarizer input for `paper` cut down to `budget` tokens: the title plus
+    the abstract and results sentences closest to the paper's centroid, or to
+    `query` when given, kept in their original order and sections.
+    `embedder` is the MiniLM SentenceTransformer the apps already load;
+    `tokenizer` (the summarizer's) makes the budget exact, otherwise
+    whitespace words are counted.
+    """
+    title = paper.get("title") or paper.get("meta_title") or ""
+    sections = [("Abstract", split_sentences(paper.get("abstract"))),
+                ("Results", split_sentences(paper.get("results")))]
+    sentences = [s for _, sents in sections for s in sents]
+    if sentences:
+        count = (lambda s: len(tokenizer.tokenize(s))) if tokenizer is not None else (lambda s: len(s.split()))
+        lengths = [count(s) for s in sentences]
+        budget = max(0, budget - count(f"Title: {title}"))
+        vecs = embedder.encode(sentences, convert_to_numpy=True, normalize_embeddings=True)
+        target = embedder.encode([query], convert_to_numpy=True, normalize_embeddings=True)[0] if query else None
+        keep = set(select_sentences(vecs, lengths, budget, target))
+    else:
+        keep = set()
+
+    parts, start = [], 0
+    for name, sents in sections:
+        kept = [s for i, s in enumerate(sents, start) if i in keep]
+        parts.append(f"{name}: {' '.join(kept)}")
+        start += len(sents)
+    return f"Title: {title}\n\n" + "\n\n".join(parts)
@@ -1,194 +1,30 @@
 import pandas as pd
 import re
-import requests
-import time
-import json
+import sys
+from pathlib import Path
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.bioc_client import DEFAULT_CONCURRENCY, DEFAULT_RATE, fetch_bioc_json, fetch_many
+from utils.bioc_store import RAW_STORE_DIR, RawBioCStore
+from utils.bioc_parser import parse_bioc, parse_bioc_batch
+from utils.corpus import PAPERS_FILE, STRUCTURED_FILE, JsonlWriter, batched
+
 CSV_URL = "https://raw.githubusercontent.com/jgalazka/SB_publications/main/SB_publication_PMC.csv"
-OUT_FILE = "papers.json"
+OUT_FILE = PAPERS_FILE
 MAX_PAPERS = 608
+# Parallel fetch settings; the rate limit is shared by all workers.
+CONCURRENCY = DEFAULT_CONCURRENCY
+RATE_LIMIT = DEFAULT_RATE
+# Raw BioC responses are cached on disk; re-runs only fetch missing papers
+# or ones older than STALE_AFTER_DAYS (None = never stale).
+STALE_AFTER_DAYS = 30
+# Papers re-parsed per batch; their passages are cleaned together over
+# PARSE_WORKERS processes (None = all cores).
+PARSE_BATCH = 256
+PARSE_WORKERS = None
 
 
-def cleanup_data(text: str):
- 
-    
-    # Normalize minus signs (U+2212 → hyphen)
-    text = text.replace("−", "-")
-
-    # Step 1: Decode Unicode escapes
-    text = text.encode('utf-8').decode('unicode_escape')
-
-    # Step 2: Optional: Remove extra backslashes (if any)
-    text = text.replace('\\', '')
-    
-    # Normalize multiple spaces / weird unicode spaces
-    text = re.sub(r"\s+", " ", text).strip()
-
-    text = re.sub(r'^\s*\d+(\.\d+)*\s*\.?\s*', '', text, flags=re.MULTILINE)
-
-    # Optional: Remove extra empty lines
-    text = re.sub(r'\n\s*\n', '\n', text).strip()
-
-    # 1. Remove figure references like (Fig. 1A), (Fig. 1B–D)
-    text = re.sub(r"\(Fig\.[^)]*\)", "", text)
-
-    # 2. Remove table references like (Table 1), (Table 2)
-    text = re.sub(r"\(Table[^)]*\)", "", text)
-
-    # Remove "Refer to Fig. X" (X can be 1, 2A, 3B–D etc.)
-    text = re.sub(r"Refer to Fig\.[^\s.]*\.?", "", text)
-
-    # 3. Remove "for full review see ..." notes
-    text = re.sub(r"\(for full review see[^)]*\)", "", text, flags=re.IGNORECASE)
-
-    return text
-
-def fetch_space_biology_data_bioc(pmcid: str):
-
-    
-    url = f"https://www.ncbi.nlm.nih.gov/research/bionlp/RESTful/pmcoa.cgi/BioC_json/{pmcid}/unicode"
-    # print(pmcid)
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        print(f"Error fetching {pmcid}: {response.status_code}")
-        return None
-
-    try:
-        paper_json = response.json()
-        # print(paper_json)
-    except Exception as e:
-        print(f"Failed to parse JSON for {pmcid}: {e}")
-        return None
-    
-    time.sleep(1)
-
-    return paper_json
-
-
-
-url = "https://raw.githubusercontent.com/jgalazka/SB_publications/main/SB_publication_PMC.csv"
-df = pd.read_csv(url)
-
-
-def get_all_paper_data(df):
-
-    paper_metadata = list()
-    for index, row in df.iterrows():
-        match = re.search(r'(PMC\d+)', row['Link'])
-        if match:
-         pmc_id = match.group(1)
-         paper_metadata.append(pmc_id)
-
-    return paper_metadata     
-
-
-table_metadata_ids = get_all_paper_data(df)
-
-def process_space_biology_data(metada_json_data):
-    paragraph_data = metada_json_data[0]["documents"][0]
-    passsages =paragraph_data['passages']
-
-
-    rows = []
-    current_l1 = None
-    current_l2 = None
-
-    for item in passsages:
-        passagge_data = item["text"]
-        t = item['infons']['type']
-        text = cleanup_data(passagge_data)
-
-        if t == "title_1":
-            current_l1 = text
-            current_l2 = None
-        elif t == "title_2":
-            current_l2 = text
-        elif t == "paragraph":
-            rows.append({
-            "level_1": current_l1,
-            "level_2": current_l2,
-            "text": text
-            })
-
-
-    return rows
-
-def fetch_all_nasa_metadata_info(metadata_list):
-
-    metadata_raw_json_response_list=list()
-
-    raw_json_data=fetch_space_biology_data_bioc(metadata_list[1])
-    space_engine_processed_data = process_space_biology_data(raw_json_data)
-    row_json = json.dumps(space_engine_processed_data)
-
-
-    print(row_json)
-
-    # for metadata_id in metadata_list:
-    #     raw_json_data=fetch_space_biology_data_bioc(metadata_id)
-        
-    #     space_engine_processed_data = process_space_biology_data(raw_json_data)
-
-    #     try:
-    #         raw_json_data = json.loads(space_engine_processed_data)
-    #         print("Valid JSON")
-    #     except json.JSONDecodeError:
-    #         print("Invalid JSON")
-
-    #     metadata_raw_json_response_list.append(raw_json_data)
-
-
-    # return metadata_raw_json_response_list  
-
-
-metadata_raw_json_response_list=fetch_all_nasa_metadata_info(table_metadata_ids)
-
-
-# print(metadata_raw_json_response_list[0])
-
-
-
-
-    
-
-# paper3_response = fetch_space_biology_data_bioc("PMC11988870")
-
-
-
-# structured = {}
-# stack = []  # keep track of nested titles
-# paragraph_data = paper3_response[0]["documents"][0]
-# passsages =paragraph_data['passages']
-
-
-# rows = []
-# current_l1 = None
-# current_l2 = None
-
-# for item in passsages:
-#     passagge_data = item["text"]
-#     t = item['infons']['type']
-#     text = cleanup_data(passagge_data)
-
-#     if t == "title_1":
-#         current_l1 = text
-#         current_l2 = None
-#     elif t == "title_2":
-#             current_l2 = text
-#     elif t == "paragraph":
-#         rows.append({
-#             "level_1": current_l1,
-#             "level_2": current_l2,
-#             "text": text
-#         })
-
-
-# row_json = json.dumps(rows)        
-
-# print(row_json)
-
 def extract_pmcid(link):
     """Extract numeric PMCID (without 'PMC' prefix) from a link if present."""
     if not isinstance(link, str):
@@ -196,67 +32,20 @@ def extract_pmcid(link):
     m = re.search(r'PMC(\d+)', link)
     return m.group(1) if m else None
 
-def fetch_bioc_sections(pmcid):
+def fetch_bioc_sections(pmcid, session=None, limiter=None):
     """
     Fetch BioC JSON for PMCID and extract sections.
     Return dict: {title, abstract, results, conclusion, raw_passages_text}
     """
-    # Use PMC prefix in URL (BioC expects 'PMC{num}')
-    url = f"https://www.ncbi.nlm.nih.gov/research/bionlp/RESTful/pmcoa.cgi/BioC_json/PMC{pmcid}/unicode"
-    try:
-        r = requests.get(url, timeout=15)
-    except Exception as e:
-        print(f"Error requesting {pmcid}: {e}")
-        return None
-
-    if r.status_code != 200:
-        # Not found or blocked
-        # print(f"Status {r.status_code} for PMC{pmcid}")
-        return None
-
-    try:
-        bio = r.json()
-    except Exception as e:
-        # Could be non-json or parse error
-        # print(f"JSON parse error for PMC{pmcid}: {e}")
-        return None
-
-    # Navigate expected BioC structure: [0]["documents"][0]["passages"]
-    try:
-        docs = bio[0].get("documents", [])
-        if not docs:
-            return None
-        passages = docs[0].get("passages", [])
-    except Exception:
+    bio = fetch_bioc_json(pmcid, session=session, limiter=limiter)
+    if bio is None:
         return None
+    return parse_bioc_sections(pmcid, bio)
 
-    out = {"pmcid": pmcid, "title": "", "abstract": "", "results": "", "conclusion": "", "full_text": ""}
-
-    for p in passages:
-        infons = p.get("infons", {}) or {}
-        section_type = (infons.get("section_type") or "").lower()
-        text = p.get("text", "") or ""
-        out["full_text"] += text + "\n"
-
-        # heuristics to populate fields (robust to various tags)
-        if ("title" in section_type or "heading" in section_type) and not out["title"]:
-            out["title"] = text.strip()
-        elif "abstract" in section_type:
-            out["abstract"] += text.strip() + " "
-        elif any(k in section_type for k in ["results", "finding", "findings", "result"]):
-            out["results"] += text.strip() + " "
-        elif any(k in section_type for k in ["conclusion", "concluding", "discussion", "summary"]):
-            out["conclusion"] += text.strip() + " "
-
-    # Fallbacks: if title empty, try first passage text
-    if not out["title"] and passages:
-        out["title"] = passages[0].get("text", "").strip()[:200]
-
-    # Trim whitespace
-    for k in ["title", "abstract", "results", "conclusion", "full_text"]:
-        out[k] = (out[k] or "").strip()
-
-    return out
+def parse_bioc_sections(pmcid, bio):
+    """Extract {title, abstract, results, conclusion, full_text} from a BioC JSON response."""
+    parsed = parse_bioc(bio, pmcid)
+    return parsed["sections"] if parsed else None
 
 def main():
     print("Loading CSV...")
@@ -271,22 +60,39 @@ def main():
 
     to_fetch = df if MAX_PAPERS is None else df.head(MAX_PAPERS)
 
-    papers = []
-    for _, row in tqdm(to_fetch.iterrows(), total=len(to_fetch), desc="Fetching PMC"):
-        pmcid = str(row["PMCID"])
-        title_meta = row.get("Title", "") or ""
-        fetched = fetch_bioc_sections(pmcid)
-        if fetched:
-            # Keep metadata from CSV and fetched content
-            fetched["meta_title"] = title_meta
-            fetched["source_link"] = row["Link"]
-            papers.append(fetched)
-        time.sleep(0.35)  
-
-    print(f"Fetched {len(papers)} papers. Saving to {OUT_FILE} ...")
-    with open(OUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(papers, f, indent=2, ensure_ascii=False)
-
+    store = RawBioCStore(RAW_STORE_DIR)
+    pmcids = [str(p) for p in to_fetch["PMCID"]]
+    todo = store.missing(pmcids, max_age_days=STALE_AFTER_DAYS)
+    print(f"{len(pmcids) - len(todo)} papers cached in {RAW_STORE_DIR}, fetching {len(todo)}.")
+    try:
+        for pmcid, bio in tqdm(fetch_many(todo, concurrency=CONCURRENCY, rate=RATE_LIMIT),
+                               total=len(todo), desc="Fetching PMC"):
+            if bio is not None:
+                store.put(pmcid, bio)
+    finally:
+        # checkpoint whatever was downloaded, even on Ctrl-C
+        store.flush()
+
+    # Parse from the local store, in CSV order, streaming straight to JSONL.
+    # One pass per paper yields both the section record and the hierarchy.
+    with JsonlWriter(OUT_FILE) as out, JsonlWriter(STRUCTURED_FILE) as structured_out, \
+            tqdm(total=len(to_fetch), desc="Parsing") as progress:
+        for rows in batched((row for _, row in to_fetch.iterrows()), PARSE_BATCH):
+            papers = [(row, store.get(str(row["PMCID"]))) for row in rows]
+            papers = [(row, bio) for row, bio in papers if bio is not None]
+            parsed_batch = parse_bioc_batch([(str(row["PMCID"]), bio) for row, bio in papers], PARSE_WORKERS)
+            progress.update(len(rows))
+            for (row, _), parsed in zip(papers, parsed_batch):
+                if not parsed:
+                    continue
+                fetched = parsed["sections"]
+                # Keep metadata from CSV and fetched content
+                fetched["meta_title"] = row.get("Title", "") or ""
+                fetched["source_link"] = row["Link"]
+                out.write(fetched)
+                structured_out.write({"pmcid": fetched["pmcid"], "grouped": parsed["grouped"]})
+
+    print(f"Saved {out.count} papers to {OUT_FILE} and {STRUCTURED_FILE}.")
     print("Over.")
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+import os
+import re
+from pathlib import Path
+
+import torch
+from sentence_transformers import SentenceTransformer
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+# "torch" (fp32 eager), "int8" (dynamic int8 quantization of the Linear layers, CPU)
+# or "onnx" (ONNX Runtime, CPU). EMBED_BACKEND / SUMMARY_BACKEND override it per model.
+BACKENDS = ("torch", "int8", "onnx")
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+EMBED_BACKEND = os.environ.get("EMBED_BACKEND", INFERENCE_BACKEND)
+SUMMARY_BACKEND = os.environ.get("SUMMARY_BACKEND", INFERENCE_BACKEND)
+# Exported ONNX seq2seq models are kept here so the export only runs once
+ONNX_DIR = "data/onnx"
+
+
+def _check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown inference backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+def embedder_id(model_name, backend=EMBED_BACKEND):
+    """Name to key cached embeddings by: vectors from different backends are not mixed."""
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+def quantize_int8(model):
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_embedder(model_name, backend=EMBED_BACKEND):
+    _check_backend(backend)
+    if backend == "onnx":
+        # needs sentence-transformers >= 3.2 with `pip install optimum[onnxruntime]`
+        return SentenceTransformer(model_name, device="cpu", backend="onnx")
+    if backend == "int8":
+        return quantize_int8(SentenceTransformer(model_name, device="cpu"))
+    return SentenceTransformer(model_name)
+
+
+def _load_onnx_seq2seq(model_name):
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise ImportError("the onnx backend needs `pip install optimum[onnxruntime]`") from e
+    export_dir = Path(ONNX_DIR) / re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    if export_dir.exists():
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+    print(f"Exporting {model_name} to ONNX (first use only) -> {export_dir}")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+    model.save_pretrained(export_dir)
+    return model
+
+
+def load_seq2seq(model_name, device=None, backend=SUMMARY_BACKEND):
+    """(tokenizer, model, device) for the summarizer on the given backend."""
+    _check_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if backend == "onnx":
+        return tokenizer, _load_onnx_seq2seq(model_name), torch.device("cpu")
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    model.eval()
+    if backend == "int8":
+        device = torch.device("cpu")
+        model = quantize_int8(model)
+    else:
+        device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model.to(device)
+    return tokenizer, model, device
@@ -0,0 +1,120 @@
+import numpy as np
+
+LAYOUT_ITERATIONS = 100
+LAYOUT_SEED = 0
+# Repulsion is computed in blocks of this many rows, so memory stays O(block * n)
+REPULSION_BLOCK = 1024
+# Pixels per unit of the ideal edge length in the final layout
+EDGE_LENGTH_PX = 80
+# Pull towards the centre; keeps small components from drifting off (radius ~ sqrt(n / GRAVITY))
+GRAVITY = 0.5
+_GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+
+def _undirected(source, target, weight):
+    src = np.concatenate([source, target]).astype(np.int64)
+    dst = np.concatenate([target, source]).astype(np.int64)
+    w = np.concatenate([weight, weight]).astype(np.float64)
+    keep = src != dst
+    return src[keep], dst[keep], w[keep]
+
+
+def label_propagation(n, source, target, weight=None, max_iter=20):
+    """
+    Community label per node: every round, each node takes the label with
+    the largest total edge weight among its neighbours (ties go to the
+    smallest label). Synchronous and deterministic; isolated nodes keep
+    their own label. Labels are renumbered 0.. by community size.
+    """
+    weight = np.ones(len(source)) if weight is None else weight
+    src, dst, w = _undirected(source, target, weight)
+    # a node's current label counts a little, which damps oscillation
+    nodes = np.concatenate([src, np.arange(n)])
+    w = np.concatenate([w, np.full(n, 0.5)])
+    labels = np.arange(n)
+    for _ in range(max_iter):
+        cand = np.concatenate([labels[dst], labels])
+        keys, inverse = np.unique(nodes * n + cand, return_inverse=True)
+        score = np.bincount(inverse, weights=w)
+        node_of, label_of = keys // n, keys % n
+        # best label per node: sort by node, then score desc, then label asc
+        order = np.lexsort((label_of, -score, node_of))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = node_of[order][1:] != node_of[order][:-1]
+        new = labels.copy()
+        new[node_of[order][first]] = label_of[order][first]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+    _, labels, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty_like(sizes)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+    return rank[labels]
+
+
+def _seed_positions(community, rng):
+    """Communities on a sunflower spiral, largest in the middle; nodes scattered around their centre."""
+    sizes = np.bincount(community)
+    # each community's centre sits at a radius that leaves room for the ones inside it
+    radius = np.sqrt(np.cumsum(sizes) - sizes / 2)
+    angle = np.arange(len(sizes)) * _GOLDEN_ANGLE
+    centres = np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=1)
+    spread = np.sqrt(sizes)[community] / 2
+    return centres[community] + rng.normal(size=(len(community), 2)) * spread[:, None]
+
+
+def force_layout(n, source, target, weight=None, community=None, iterations=LAYOUT_ITERATIONS, seed=LAYOUT_SEED):
+    """
+    Fruchterman-Reingold layout, vectorized with NumPy: all-pairs repulsion
+    (computed block-wise), attraction along edges scaled by log edge weight,
+    a pull to the centre for disconnected pieces, and a linearly cooling
+    step cap. Seeded from `community` when given, with a fixed RNG seed, so
+    the same graph always gets the same layout. Returns (n, 2) float32
+    coordinates in pixels, centred on 0.
+    """
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    weight = np.ones(len(source)) if weight is None else weight
+    src, dst, w = _undirected(source, target, weight)
+    w = (1 + np.log(w)).astype(np.float32)
+    pos = _seed_positions(community, rng) if community is not None else rng.normal(size=(n, 2)) * np.sqrt(n) / 2
+    pos = pos.astype(np.float32)
+    k = 1.0  # ideal edge length; the seed layout is already in these units
+    temperature = np.sqrt(n) / 4
+
+    for step in range(iterations):
+        disp = np.zeros_like(pos)
+        x, y = pos[:, 0], pos[:, 1]
+        for start in range(0, n, REPULSION_BLOCK):
+            end = start + REPULSION_BLOCK
+            dx, dy = x[start:end, None] - x[None, :], y[start:end, None] - y[None, :]
+            force = (k * k) / np.maximum(dx * dx + dy * dy, 1e-4)
+            disp[start:end, 0] += (dx * force).sum(axis=1)
+            disp[start:end, 1] += (dy * force).sum(axis=1)
+        # src -> dst appears in both directions, so each endpoint is pulled once per edge
+        delta = pos[src] - pos[dst]
+        dist = np.sqrt((delta ** 2).sum(-1))
+        np.add.at(disp, src, -delta * (dist * w / k)[:, None])
+        disp -= pos * GRAVITY
+
+        length = np.maximum(np.sqrt((disp ** 2).sum(-1)), 1e-9)
+        cap = temperature * (1 - step / iterations)
+        pos += disp * (np.minimum(length, cap) / length)[:, None]
+
+    pos -= pos.mean(axis=0)
+    return (pos * EDGE_LENGTH_PX).astype(np.float32)
+
+
+def layout_graph(entities, edges, iterations=LAYOUT_ITERATIONS, seed=LAYOUT_SEED):
+    """Add "x", "y" and "community" to each entity dict (IDs are 0..n-1); returns entities."""
+    n = len(entities)
+    source = np.asarray([e["source"] for e in edges], dtype=np.int64)
+    target = np.asarray([e["target"] for e in edges], dtype=np.int64)
+    support = np.asarray([e["support"] for e in edges], dtype=np.float64)
+    community = label_propagation(n, source, target, support)
+    pos = force_layout(n, source, target, support, community, iterations, seed)
+    for e in entities:
+        i = e["id"]
+        e["x"], e["y"], e["community"] = round(float(pos[i, 0]), 1), round(float(pos[i, 1]), 1), int(community[i])
+    return entities
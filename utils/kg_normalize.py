@@ -0,0 +1,135 @@
+import json
+import os
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+from utils.text_clean import fix_mojibake
+
+# Normalized entities/edges written by scripts/build_kg.py
+KG_GRAPH_FILE = "output/knowledge_graph.json"
+# Longer entities are treated as clauses and cut at the first clause marker
+MAX_ENTITY_WORDS = 6
+
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"'})
+_PAREN_RE = re.compile(r"\s*[(\[][^()\[\]]*[)\]]")
+_LEADING_DET_RE = re.compile(r"^(?:(?:the|a|an|this|these|those|such|its|their)\s+)+", re.IGNORECASE)
+_CLAUSE_RE = re.compile(
+    r",|;|:|\s(?:characterized by|such as|e\.g\.|i\.e\.|including|compared to|which|that|who|whose|where|while"
+    r"|to|in order to|by|with)\s",
+    re.IGNORECASE,
+)
+_EDGE_PUNCT = " \t\"'.,;:!?-"
+# Hedging qualifiers that do not change which entity is meant
+_QUALIFIER_RE = re.compile(r"^(?:(?:significant|critical|various|several|different|specific|key|important|major|"
+                           r"numerous|many|certain|potential|notable|distinct|overall)\s+)+", re.IGNORECASE)
+_COPULAS = {"are": "is", "was": "is", "were": "is", "be": "is", "have": "has", "had": "has"}
+
+
+def clean_entity(text):
+    """Display form: mojibake fixed, parentheticals and leading articles dropped, clauses cut."""
+    text = unicodedata.normalize("NFKC", fix_mojibake(text or "")).translate(_QUOTES)
+    text = _PAREN_RE.sub("", text)
+    text = " ".join(text.split()).strip(_EDGE_PUNCT)
+    text = _QUALIFIER_RE.sub("", _LEADING_DET_RE.sub("", text))
+    if len(text.split()) > MAX_ENTITY_WORDS:
+        # "a condition characterized by minimal ..." -> "condition"
+        m = _CLAUSE_RE.search(text)
+        if m and m.start() > 0:
+            text = text[:m.start()]
+        text = " ".join(text.split()[:MAX_ENTITY_WORDS])
+    return text.strip(_EDGE_PUNCT)
+
+
+def _singular(word):
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is", "ys")):
+        return word[:-3] + "y" if word.endswith("ies") else word[:-1]
+    return word
+
+
+def entity_key(label):
+    """Merge key: case-insensitive, last word singularized ("T cells" == "T cell")."""
+    words = label.lower().split()
+    if words:
+        words[-1] = _singular(words[-1])
+    return " ".join(words)
+
+
+def clean_relation(text):
+    """Lower-cased, with copulas unified ("were associated with" -> "is associated with")."""
+    words = fix_mojibake(text or "").lower().strip(_EDGE_PUNCT).split()
+    if words:
+        words[0] = _COPULAS.get(words[0], words[0])
+    return " ".join(words)
+
+
+class KnowledgeGraphBuilder:
+    """
+    Interns normalized entities to integer IDs and merges duplicate
+    (subject, relation, object) edges, keeping a support count and the
+    PMCIDs each edge was extracted from.
+    """
+
+    def __init__(self):
+        self._ids = {}        # entity key -> id
+        self._surface = []    # id -> Counter of display forms
+        self._edges = {}      # (source, relation, target) -> {"support", "pmcids"}
+        self.raw_triplets = 0
+        self.dropped = 0
+
+    def entity_id(self, text):
+        label = clean_entity(text)
+        if not re.search(r"\w", label):
+            return None
+        key = entity_key(label)
+        i = self._ids.get(key)
+        if i is None:
+            i = self._ids[key] = len(self._surface)
+            self._surface.append(Counter())
+        self._surface[i][label] += 1
+        return i
+
+    def add(self, subject, relation, obj, pmcid=None):
+        self.raw_triplets += 1
+        source, target, relation = self.entity_id(subject), self.entity_id(obj), clean_relation(relation)
+        if source is None or target is None or not relation or source == target:
+            self.dropped += 1
+            return
+        edge = self._edges.setdefault((source, relation, target), {"support": 0, "pmcids": set()})
+        edge["support"] += 1
+        if pmcid:
+            edge["pmcids"].add(str(pmcid))
+
+    def add_records(self, records):
+        for r in records:
+            self.add(r["subject"], r.get("relation") or r.get("predicate"), r["object"], r.get("pmcid"))
+        return self
+
+    def entities(self):
+        """[{"id", "label", "mentions"}]; the label is the most frequent display form."""
+        return [{"id": i, "label": forms.most_common(1)[0][0], "mentions": sum(forms.values())}
+                for i, forms in enumerate(self._surface)]
+
+    def edges(self):
+        return [{"source": s, "relation": rel, "target": t, "support": e["support"], "pmcids": sorted(e["pmcids"])}
+                for (s, rel, t), e in self._edges.items()]
+
+    def save(self, path=KG_GRAPH_FILE):
+        save_graph(self.entities(), self.edges(), path)
+
+
+def save_graph(entities, edges, path=KG_GRAPH_FILE):
+    """Write entities (with any layout fields) and edges as one JSON file."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"entities": entities, "edges": edges}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_graph(path=KG_GRAPH_FILE):
+    """(entities, edges) as written by save_graph."""
+    with open(path, "r", encoding="utf-8") as f:
+        graph = json.load(f)
+    return graph["entities"], graph["edges"]
@@ -0,0 +1,61 @@
+from pyvis.network import Network
+
+# PMCIDs listed in an edge tooltip before it is cut short
+MAX_TOOLTIP_PMCIDS = 10
+HIGHLIGHT_COLOR = "#e4572e"
+# Node colours by community (utils/kg_layout.py), cycled
+COMMUNITY_COLORS = ("#4e79a7", "#59a14f", "#edc948", "#b07aa1", "#76b7b2", "#f28e2b", "#9c755f", "#bab0ac")
+
+
+def merge_parallel(edges):
+    """One drawn edge per (source, target) pair; parallel relations share it."""
+    pairs = {}
+    for e in edges:
+        pairs.setdefault((e["source"], e["target"]), []).append(e)
+    for (source, target), rels in pairs.items():
+        support = sum(r["support"] for r in rels)
+        pmcids = sorted({p for r in rels for p in r["pmcids"]})
+        title = "; ".join(f"{r['relation']} ({r['support']})" for r in rels)
+        if pmcids:
+            title += " | PMCIDs: " + ", ".join(pmcids[:MAX_TOOLTIP_PMCIDS]) \
+                     + (" ..." if len(pmcids) > MAX_TOOLTIP_PMCIDS else "")
+        yield source, target, " / ".join(r["relation"] for r in rels), title, support
+
+
+def graph_network(nodes, edges, highlight=(), height="750px"):
+    """
+    pyvis Network for `nodes` ({id, label, mentions}, plus x, y and
+    community when the graph has a layout) and `edges` (edge dicts); nodes
+    in `highlight` (the query entities) are drawn in a different colour.
+
+    With precomputed positions the page is drawn as-is: vis.js physics is
+    off and edges are straight, so nothing is simulated in the browser.
+    """
+    highlight = set(highlight)
+    fixed = bool(nodes) and all("x" in n for n in nodes)
+    net = Network(notebook=False, directed=True, height=height, width="100%")
+    for n in nodes:
+        extra = {}
+        if fixed:
+            extra.update(x=n["x"], y=n["y"], physics=False,
+                         color=COMMUNITY_COLORS[n.get("community", 0) % len(COMMUNITY_COLORS)])
+        if n["id"] in highlight:
+            extra["color"] = HIGHLIGHT_COLOR
+        net.add_node(n["id"], label=n["label"], title=f"{n['label']} ({n['mentions']} mentions)",
+                     value=n["mentions"], **extra)
+    for source, target, label, title, support in merge_parallel(edges):
+        net.add_edge(source, target, label=label, title=title, value=support)
+    if fixed:
+        net.toggle_physics(False)
+        net.options.edges.smooth.enabled = False
+    return net
+
+
+def subgraph_html(kg, nodes, edges, highlight=(), height="750px"):
+    """Standalone HTML for a KGStore subgraph (node and edge IDs from KGStore.subgraph)."""
+    node_dicts = [{"id": int(i), "label": kg.labels[i], "mentions": int(kg.mentions[i])} for i in nodes]
+    if kg.has_layout:
+        for n in node_dicts:
+            x, y = kg.positions[n["id"]]
+            n.update(x=float(x), y=float(y), community=int(kg.community[n["id"]]))
+    return graph_network(node_dicts, [kg.edge(e) for e in edges], highlight, height).generate_html()
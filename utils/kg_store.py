@@ -0,0 +1,256 @@
+import json
+import os
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from utils.kg_normalize import KG_GRAPH_FILE, clean_entity, entity_key, load_graph
+
+KG_DIR = "data/kg"
+DEFAULT_HOPS = 2
+DEFAULT_MAX_NODES = 200
+
+
+def _csr(keys, values, n):
+    """Group `values` by `keys` (node IDs 0..n-1) into (offsets, values sorted by key)."""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(keys, minlength=n))
+    return offsets, values[order].astype(np.int32)
+
+
+class KGStore:
+    """
+    Read-only knowledge graph over compact arrays: int32 edge source,
+    target, relation-id and support columns, plus outgoing and incoming
+    CSR adjacency (int64 offsets into int32 edge IDs). Each edge's source
+    PMCIDs are CSR too (`edge_pmcid_ptr` into `edge_pmcid_idx`, which points
+    into the interned `pmcids` table). A small JSON header holds only the
+    string tables (labels, their normalized keys, relations, PMCIDs); the
+    key -> ID dict is zipped from the stored keys without re-normalizing, and
+    the arrays are memory-mapped on load. `positions` (float32, n x 2, NaN
+    when the graph was built without a layout) and `community` come from
+    utils/kg_layout.py.
+    """
+
+    def __init__(self, labels, keys, relations, pmcids, mentions,
+                 source, target, relation, support, out_offsets, out_edges, in_offsets, in_edges,
+                 edge_pmcid_ptr, edge_pmcid_idx, positions=None, community=None):
+        self.labels = labels
+        self.keys = keys
+        self.mentions = mentions
+        self.positions = positions if positions is not None else np.full((len(labels), 2), np.nan, np.float32)
+        self.community = community if community is not None else np.zeros(len(labels), dtype=np.int32)
+        self.relations = relations
+        self.pmcids = pmcids
+        self.edge_pmcid_ptr = edge_pmcid_ptr
+        self.edge_pmcid_idx = edge_pmcid_idx
+        self.source = source
+        self.target = target
+        self.relation = relation
+        self.support = support
+        self.out_offsets = out_offsets
+        self.out_edges = out_edges
+        self.in_offsets = in_offsets
+        self.in_edges = in_edges
+        self.index = dict(zip(keys, range(len(keys))))
+        self.degree = np.diff(out_offsets) + np.diff(in_offsets)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def num_edges(self):
+        return len(self.source)
+
+    @classmethod
+    def build(cls, entities, edges):
+        """entities/edges as written by KnowledgeGraphBuilder (IDs are 0..n-1)."""
+        n = len(entities)
+        labels = [None] * n
+        mentions = np.zeros(n, dtype=np.int32)
+        positions = np.full((n, 2), np.nan, dtype=np.float32)
+        community = np.zeros(n, dtype=np.int32)
+        for e in entities:
+            labels[e["id"]] = e["label"]
+            mentions[e["id"]] = e["mentions"]
+            if "x" in e:
+                positions[e["id"]] = e["x"], e["y"]
+                community[e["id"]] = e.get("community", 0)
+        relations, rel_ids = [], {}
+        for e in edges:
+            if e["relation"] not in rel_ids:
+                rel_ids[e["relation"]] = len(relations)
+                relations.append(e["relation"])
+
+        source = np.asarray([e["source"] for e in edges], dtype=np.int32)
+        target = np.asarray([e["target"] for e in edges], dtype=np.int32)
+        relation = np.asarray([rel_ids[e["relation"]] for e in edges], dtype=np.int32)
+        support = np.asarray([e["support"] for e in edges], dtype=np.int32)
+        edge_ids = np.arange(len(edges), dtype=np.int32)
+        out_offsets, out_edges = _csr(source, edge_ids, n)
+        in_offsets, in_edges = _csr(target, edge_ids, n)
+
+        pmcids, pmcid_ids, idx = [], {}, []
+        edge_pmcid_ptr = np.zeros(len(edges) + 1, dtype=np.int64)
+        for i, e in enumerate(edges):
+            for p in e.get("pmcids", ()):
+                if p not in pmcid_ids:
+                    pmcid_ids[p] = len(pmcids)
+                    pmcids.append(p)
+                idx.append(pmcid_ids[p])
+            edge_pmcid_ptr[i + 1] = len(idx)
+        return cls(labels, [entity_key(label) for label in labels], relations, pmcids, mentions,
+                   source, target, relation, support, out_offsets, out_edges, in_offsets, in_edges,
+                   edge_pmcid_ptr, np.asarray(idx, dtype=np.int32), positions, community)
+
+    @classmethod
+    def from_graph_file(cls, path=KG_GRAPH_FILE):
+        return cls.build(*load_graph(path))
+
+    _ARRAYS = ("mentions", "source", "target", "relation", "support", "out_offsets", "out_edges",
+               "in_offsets", "in_edges", "edge_pmcid_ptr", "edge_pmcid_idx", "positions", "community")
+
+    def save(self, root=KG_DIR):
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        for name in self._ARRAYS:
+            np.save(root / f"{name}.npy", getattr(self, name))
+        tmp = root / "graph.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"labels": self.labels, "keys": self.keys, "relations": self.relations, "pmcids": self.pmcids},
+                      f, ensure_ascii=False)
+        os.replace(tmp, root / "graph.json")
+
+    @classmethod
+    def load(cls, root=KG_DIR):
+        root = Path(root)
+        with open(root / "graph.json", "r", encoding="utf-8") as f:
+            header = json.load(f)
+        arrays = {name: np.load(root / f"{name}.npy", mmap_mode="r") for name in cls._ARRAYS}
+        return cls(header["labels"], header["keys"], header["relations"], header["pmcids"], **arrays)
+
+    # -- lookups ------------------------------------------------------------
+
+    def entity_id(self, text):
+        """ID of the entity `text` normalizes to, or None."""
+        return self.index.get(entity_key(clean_entity(text)))
+
+    def find(self, term, limit=10):
+        """Entity IDs matching `term`: the exact entity first, then labels containing it, by degree."""
+        exact = self.entity_id(term)
+        term = term.lower().strip()
+        hits = [i for i, label in enumerate(self.labels) if term and term in label.lower() and i != exact]
+        hits.sort(key=lambda i: -int(self.degree[i]))
+        return ([exact] if exact is not None else []) + hits[:limit - (exact is not None)]
+
+    @property
+    def has_layout(self):
+        return bool(len(self.positions)) and not np.isnan(self.positions).any()
+
+    def edge(self, e):
+        """Edge `e` as a {source, relation, target, support, pmcids} dict."""
+        return {"source": int(self.source[e]), "relation": self.relations[self.relation[e]],
+                "target": int(self.target[e]), "support": int(self.support[e]), "pmcids": self.edge_pmcids(e)}
+
+    def edge_pmcids(self, e):
+        """PMCIDs edge `e` was extracted from."""
+        start, end = self.edge_pmcid_ptr[e], self.edge_pmcid_ptr[e + 1]
+        return [self.pmcids[i] for i in self.edge_pmcid_idx[start:end]]
+
+    def out_edge_ids(self, node):
+        return self.out_edges[self.out_offsets[node]:self.out_offsets[node + 1]]
+
+    def in_edge_ids(self, node):
+        return self.in_edges[self.in_offsets[node]:self.in_offsets[node + 1]]
+
+    def neighbors(self, node, direction="both"):
+        """Sorted unique neighbour IDs; direction is "out", "in" or "both"."""
+        parts = []
+        if direction in ("out", "both"):
+            parts.append(self.target[self.out_edge_ids(node)])
+        if direction in ("in", "both"):
+            parts.append(self.source[self.in_edge_ids(node)])
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int32)
+
+    def top_degree(self, n=20):
+        """[(entity ID, degree)] for the `n` best-connected entities."""
+        top = np.argsort(-self.degree, kind="stable")[:n]
+        return [(int(i), int(self.degree[i])) for i in top]
+
+    # -- traversal ----------------------------------------------------------
+
+    def _frontier_edges(self, frontier):
+        """IDs of all edges touching any node in `frontier`."""
+        slices = [self.out_edge_ids(v) for v in frontier] + [self.in_edge_ids(v) for v in frontier]
+        return np.unique(np.concatenate(slices)) if slices else np.empty(0, dtype=np.int32)
+
+    def subgraph(self, seeds, hops=DEFAULT_HOPS, max_nodes=DEFAULT_MAX_NODES, rank="support"):
+        """
+        k-hop neighbourhood of `seeds`, ignoring edge direction. Returns
+        (node IDs, edge IDs between them). Each hop keeps the candidates
+        with the highest total edge support to the nodes already kept
+        (rank="support") or the highest degree (rank="degree") until
+        `max_nodes` is reached.
+        """
+        keep = list(dict.fromkeys(int(s) for s in seeds))[:max_nodes]
+        kept = set(keep)
+        frontier = keep
+        for _ in range(hops):
+            if len(keep) >= max_nodes or not frontier:
+                break
+            edges = self._frontier_edges(frontier)
+            other = np.where(np.isin(self.source[edges], frontier), self.target[edges], self.source[edges])
+            weight = self.support[edges] if rank == "support" else np.ones(len(edges), dtype=np.int32)
+            score = {}
+            for v, w in zip(other.tolist(), weight.tolist()):
+                if v not in kept:
+                    score[v] = score.get(v, 0) + w
+            if rank == "degree":
+                score = {v: int(self.degree[v]) for v in score}
+            frontier = sorted(score, key=lambda v: (-score[v], v))[:max_nodes - len(keep)]
+            keep.extend(frontier)
+            kept.update(frontier)
+        nodes = np.asarray(keep, dtype=np.int32)
+        edges = self._frontier_edges(nodes)
+        inside = np.isin(self.source[edges], nodes) & np.isin(self.target[edges], nodes)
+        return nodes, edges[inside]
+
+    def shortest_path(self, start, goal, max_hops=6):
+        """Entity IDs on a shortest undirected path from start to goal, or None."""
+        if start == goal:
+            return [start]
+        parent = {start: None}
+        queue = deque([(start, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            if depth >= max_hops:
+                continue
+            for nxt in self.neighbors(node).tolist():
+                if nxt in parent:
+                    continue
+                parent[nxt] = node
+                if nxt == goal:
+                    path = [goal]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    return path[::-1]
+                queue.append((nxt, depth + 1))
+        return None
+
+
+def load_kg(root=KG_DIR, graph_path=KG_GRAPH_FILE):
+    """Load the persisted store, rebuilding it only when the normalized graph JSON is newer."""
+    header = Path(root) / "graph.json"
+    graph = Path(graph_path)
+    if header.exists() and (not graph.exists() or graph.stat().st_mtime <= header.stat().st_mtime):
+        try:
+            return KGStore.load(root)
+        except (KeyError, FileNotFoundError):
+            if not graph.exists():
+                raise
+            # saved by an older version of the store: rebuild below
+    store = KGStore.from_graph_file(graph_path)
+    store.save(root)
+    return store
@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+
+# Paper metadata by vector ID; replaces the all-in-memory papers_meta.json
+META_DB_FILE = "data/papers_meta.sqlite"
+META_FIELDS = ("pmcid", "title", "meta_title", "source_link", "abstract", "results", "conclusion",
+               "full_text_preview")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS papers (
+    row_id INTEGER PRIMARY KEY,
+    {", ".join(f"{f} TEXT" for f in META_FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS papers_pmcid ON papers (pmcid);
+"""
+
+
+class MetaStore:
+    """
+    SQLite-backed paper metadata keyed by FAISS row ID. Records are fetched
+    on demand, so opening the store costs the same regardless of corpus size.
+    Safe to share between threads (one connection guarded by a lock).
+    """
+
+    def __init__(self, path=META_DB_FILE, readonly=False):
+        self.path = path
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            # readers (the apps) keep working while the index build writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._columns = ", ".join(META_FIELDS)
+
+    def _record(self, row):
+        return dict(zip(META_FIELDS, row))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def get(self, row_id):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {self._columns} FROM papers WHERE row_id = ?",
+                                     (int(row_id),)).fetchone()
+        return self._record(row) if row else None
+
+    def get_many(self, row_ids):
+        """{row_id: record} for the IDs that exist."""
+        row_ids = [int(i) for i in row_ids]
+        if not row_ids:
+            return {}
+        marks = ",".join("?" * len(row_ids))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT row_id, {self._columns} FROM papers WHERE row_id IN ({marks})",
+                                      row_ids).fetchall()
+        return {row[0]: self._record(row[1:]) for row in rows}
+
+    def get_by_pmcids(self, pmcids):
+        """{pmcid: record} for the PMCIDs that exist."""
+        pmcids = [str(p) for p in pmcids]
+        if not pmcids:
+            return {}
+        marks = ",".join("?" * len(pmcids))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {self._columns} FROM papers WHERE pmcid IN ({marks})",
+                                      pmcids).fetchall()
+        return {record["pmcid"]: record for record in map(self._record, rows)}
+
+    def iter_items(self):
+        """Yield (row_id, record) in row order."""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT row_id, {self._columns} FROM papers ORDER BY row_id").fetchall()
+        for row in rows:
+            yield row[0], self._record(row[1:])
+
+    def upsert_many(self, items):
+        """items: iterable of (row_id, record)."""
+        marks = ",".join("?" * (len(META_FIELDS) + 1))
+        rows = [(int(i), *(record.get(f) for f in META_FIELDS)) for i, record in items]
+        with self._lock:
+            self._conn.executemany(f"INSERT OR REPLACE INTO papers (row_id, {self._columns}) VALUES ({marks})", rows)
+
+    def delete(self, row_ids):
+        with self._lock:
+            self._conn.executemany("DELETE FROM papers WHERE row_id = ?", [(int(i),) for i in row_ids])
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM papers")
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+
+from utils.ann_index import load_index
+from utils.bm25 import BM25_DIR, BM25Index, is_lexical_query, rrf_fuse
+from utils.inference import load_embedder
+from utils.meta_store import META_DB_FILE, MetaStore
+
+# Artifacts written by scripts/semantic-searching.py and shared by every app
+FAISS_INDEX_FILE = "data/papers_index.faiss"
+EMBED_MODEL = "all-MiniLM-L6-v2"
+
+SEARCH_MODES = ("auto", "hybrid", "dense", "lexical")
+# Hybrid mode fuses this many candidates per requested result from each retriever
+HYBRID_DEPTH = 4
+
+
+class PaperSearcher:
+    """
+    Search over the persisted paper index. Dense search is one query encode
+    plus a FAISS lookup; lexical search uses the BM25 postings built next to
+    it; hybrid fuses both with reciprocal rank fusion. Pass an already-loaded
+    SentenceTransformer as `model` to share it with other parts of an app;
+    otherwise one is loaded on the configured inference backend.
+    """
+
+    def __init__(self, index_path=FAISS_INDEX_FILE, meta_path=META_DB_FILE, model=None, model_name=EMBED_MODEL,
+                 bm25_dir=BM25_DIR):
+        self.index, self.params = load_index(index_path)
+        # records are fetched by vector ID only for the hits being returned
+        self.meta = MetaStore(meta_path, readonly=True)
+        self.bm25 = BM25Index.load(bm25_dir) if os.path.exists(os.path.join(bm25_dir, "vocab.json")) else None
+        self.model = model if model is not None else load_embedder(model_name)
+
+    def encode(self, queries):
+        return self.model.encode(list(queries), convert_to_numpy=True, normalize_embeddings=True)
+
+    def dense_hits(self, qvecs, top_k=5):
+        """[(row_id, score)] per query vector."""
+        D, I = self.index.search(np.asarray(qvecs, dtype=np.float32), top_k)
+        return [[(int(i), float(s)) for i, s in zip(ids, scores) if i >= 0] for ids, scores in zip(I, D)]
+
+    def lexical_hits(self, query, top_k=5):
+        return self.bm25.search(query, top_k) if self.bm25 is not None else []
+
+    def resolve_mode(self, query, mode="auto"):
+        if self.bm25 is None:
+            return "dense"
+        if mode == "auto":
+            # identifier-like queries skip the encoder entirely
+            return "lexical" if is_lexical_query(query) else "hybrid"
+        return mode
+
+    def with_records(self, hit_lists):
+        """Attach meta records to [(row_id, score)] lists; IDs missing from the store were deleted."""
+        records = self.meta.get_many({row for hits in hit_lists for row, _ in hits})
+        return [[(records[row], score) for row, score in hits if row in records] for hits in hit_lists]
+
+    def search_vectors(self, qvecs, top_k=5):
+        """Dense search for a batch of query vectors; returns one [(item, score)] list per query."""
+        return self.with_records(self.dense_hits(qvecs, top_k))
+
+    def fuse(self, dense, lexical, top_k=5):
+        return rrf_fuse([dense, lexical], top_k=top_k)
+
+    def search(self, query, top_k=5, mode="auto", qvec=None):
+        """
+        [(item, score)] for one query. `qvec` reuses an embedding the caller
+        already computed; lexical mode never touches the encoder.
+        """
+        mode = self.resolve_mode(query, mode)
+        if mode == "lexical":
+            hits = self.lexical_hits(query, top_k)
+        else:
+            if qvec is None:
+                qvec = self.encode([query])[0]
+            depth = top_k * HYBRID_DEPTH if mode == "hybrid" else top_k
+            hits = self.dense_hits(np.asarray(qvec)[None, :], depth)[0]
+            if mode == "hybrid":
+                hits = self.fuse(hits, self.lexical_hits(query, depth), top_k)
+        return self.with_records([hits])[0]
@@ -0,0 +1,140 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 3600
+# Cosine similarity above which a new query reuses a cached query's results
+DEFAULT_SIMILARITY = 0.97
+
+
+def normalize_query(query):
+    return " ".join(re.sub(r"[^\w\s-]", " ", query.lower()).split())
+
+
+def file_signature(*paths):
+    """(mtime, size) of each path; changes whenever an index file is rewritten."""
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append((path, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append((path, None, None))
+    return tuple(sig)
+
+
+class SemanticQueryCache:
+    """
+    Bounded LRU + TTL cache of search results.
+
+    Lookups first match the normalized query text exactly (no encode needed),
+    then fall back to the cached query embedding closest to the new one if
+    its cosine similarity is above `similarity`. Every lookup() counts exactly
+    one exact hit, semantic hit or miss. `namespace` separates result sets
+    that differ in search settings (top_k, mode, ...). Call validate() with
+    the current index signature to drop everything when the index changes.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 similarity=DEFAULT_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._entries = OrderedDict()  # (namespace, normalized query) -> (vector, results, created)
+        self._lock = threading.Lock()
+        self._signature = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def validate(self, signature):
+        with self._lock:
+            if signature != self._signature:
+                if self._signature is not None:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._signature = signature
+
+    def _expired(self, created, now):
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def _exact(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry[2], now):
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _similar(self, vector, namespace, now):
+        """Results of the nearest cached query in `namespace` above the threshold, or None."""
+        keys, vectors = [], []
+        for key, (vec, _, created) in list(self._entries.items()):
+            if self._expired(created, now):
+                del self._entries[key]
+            elif key[0] == namespace and vec is not None:
+                keys.append(key)
+                vectors.append(vec)
+        if not vectors:
+            return None
+        sims = np.stack(vectors) @ np.asarray(vector, dtype=np.float32)
+        best = int(np.argmax(sims))
+        if sims[best] < self.similarity:
+            return None
+        self._entries.move_to_end(keys[best])
+        return self._entries[keys[best]][1]
+
+    def lookup(self, query, namespace=None, encode=None):
+        """
+        Exact (normalized text) lookup, then, if `encode` is given, the
+        nearest cached query embedding. `encode()` returns the query vector
+        and is only called after an exact miss. Returns (results or None,
+        vector or None); the lookup is counted once.
+        """
+        key = (namespace, normalize_query(query))
+        with self._lock:
+            results = self._exact(key, time.time())
+            if results is not None:
+                self.exact_hits += 1
+                return results, None
+        # encode outside the lock: it is the slow part
+        vector = encode() if encode is not None else None
+        with self._lock:
+            results = self._similar(vector, namespace, time.time()) if vector is not None else None
+            if results is not None:
+                self.semantic_hits += 1
+            else:
+                self.misses += 1
+            return results, vector
+
+    def get(self, query, namespace=None):
+        """Exact lookup only; returns results or None."""
+        return self.lookup(query, namespace)[0]
+
+    def put(self, query, vector, results, namespace=None):
+        key = (namespace, normalize_query(query))
+        with self._lock:
+            vector = None if vector is None else np.asarray(vector, dtype=np.float32)
+            self._entries[key] = (vector, results, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,216 @@
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.chunk_store import iter_section_chunks
+from utils.extractive import split_sentences
+
+RULE_TRIPLETS_FILE = "output/triplets-rules.json"
+MAX_SUBJECT_WORDS = 6
+MAX_OBJECT_WORDS = 8
+
+# Relation verbs common in the corpus: (regex for the inflected forms, canonical relation)
+_RELATIONS = (
+    (r"up-?regulat(?:e|es|ed|ing)", "upregulates"),
+    (r"down-?regulat(?:e|es|ed|ing)", "downregulates"),
+    (r"increas(?:e|es|ed)", "increases"),
+    (r"decreas(?:e|es|ed)", "decreases"),
+    (r"reduc(?:e|es|ed)", "reduces"),
+    (r"induc(?:e|es|ed)", "induces"),
+    (r"inhibit(?:s|ed)?", "inhibits"),
+    (r"suppress(?:es|ed)?", "suppresses"),
+    (r"activat(?:e|es|ed)", "activates"),
+    (r"stimulat(?:e|es|ed)", "stimulates"),
+    (r"regulat(?:e|es|ed)", "regulates"),
+    (r"mediat(?:e|es|ed)", "mediates"),
+    (r"promot(?:e|es|ed)", "promotes"),
+    (r"enhanc(?:e|es|ed)", "enhances"),
+    (r"impair(?:s|ed)?", "impairs"),
+    (r"disrupt(?:s|ed)?", "disrupts"),
+    (r"compromis(?:e|es|ed)", "compromises"),
+    (r"weaken(?:s|ed)?", "weakens"),
+    (r"alter(?:s|ed)?", "alters"),
+    (r"affect(?:s|ed)?", "affects"),
+    (r"impact(?:s|ed)?", "impacts"),
+    (r"trigger(?:s|ed)?", "triggers"),
+    (r"caus(?:e|es|ed)", "causes"),
+    (r"prevent(?:s|ed)?", "prevents"),
+    (r"govern(?:s|ed)?", "governs"),
+    (r"protect(?:s|ed)? against", "protects against"),
+    (r"(?:lead|leads|led) to", "leads to"),
+    (r"result(?:s|ed)? in", "results in"),
+    (r"contribut(?:e|es|ed) to", "contributes to"),
+    (r"depend(?:s|ed)? on", "depends on"),
+    # stative forms, only used with a copula ("X is associated with Y")
+    (r"associated with", "is associated with"),
+    (r"required for", "is required for"),
+    (r"involved in", "is involved in"),
+    (r"expressed in", "is expressed in"),
+    (r"occur(?:s|red)? in", "occurs in"),
+)
+
+_STATIVE = frozenset(i for i, (_, canonical) in enumerate(_RELATIONS) if canonical.startswith("is "))
+# "an increase in", "the impact of": noun uses of these verbs
+_NOMINAL = frozenset(i for i, (_, canonical) in enumerate(_RELATIONS)
+                     if canonical in ("increases", "decreases", "reduces", "impacts", "affects", "alters", "causes"))
+
+_VERB_RE = re.compile(
+    r"(?<![-\w])(?P<modal>(?:(?:can|could|may|might|will|would|should|must|has|have|had|not|to)\s+)+)?"
+    r"(?P<aux>(?:is|are|was|were|be|been|being)\s+)?"
+    r"(?:\w+ly\s+)*"  # adverbs: "significantly reduced"
+    r"(?<![-\w])(?P<verb>" + "|".join(f"(?P<r{i}>{pattern})" for i, (pattern, _) in enumerate(_RELATIONS)) + r")"
+    r"(?P<by>\s+by)?\b",
+    re.IGNORECASE,
+)
+
+# A subject starts after the last clause boundary before the verb ...
+_LEFT_BOUNDARY_RE = re.compile(r".*(?:[,;:()\[\]\u2014]|\b(?:which|that|while|whereas|but|because|although|when)\b)",
+                               re.IGNORECASE | re.DOTALL)
+# ... and an object ends at the first one after it
+_RIGHT_BOUNDARY_RE = re.compile(r"[,;:.()\[\]\u2014]|\b(?:which|that|while|whereas|but|because|although|when)\b",
+                                re.IGNORECASE)
+_RELATIVE_TAIL_RE = re.compile(r",?\s*(?:which|that)\s*$", re.IGNORECASE)
+# "X has been shown to cause Y" -> the subject is X
+_RAISING_TAIL_RE = re.compile(r"\s+(?:(?:has|have|had)\s+been|is|are|was|were|appears?|seems?)"
+                              r"(?:\s+(?:shown|reported|found|known|thought|likely|suggested))?\s*$", re.IGNORECASE)
+_LEADING_DET_RE = re.compile(r"^(?:(?:the|a|an|this|these|those|its|their|such|both|also|and|or)\s+)+",
+                             re.IGNORECASE)
+_FUNCTION_WORDS = frozenset(
+    "it this these those they we which that there he she one them its their here also and or of to in the a an "
+    "is are was were be been may might can could shows show showed leading with where suggesting indicating "
+    "including".split()
+)
+# An "-ed" form right after these is an adjective, not the verb: "revealed increased levels"
+_BEFORE_ADJECTIVE = frozenset(
+    "with of in on for to by reveal reveals revealed show shows showed shown demonstrate demonstrates "
+    "demonstrated include includes included exhibit exhibits exhibited display displays displayed had has have "
+    "found observed suggest suggests suggested indicate indicates indicated where partially as".split()
+)
+# An "-ed" form after to/and/or followed by one of these is not inside a noun phrase
+_NOUN_PHRASE_RE = re.compile(r"\s+(?!(?:and|or|by|in|of|to|with|for|on|at|from|during|after|than|as)\b)[\w(]",
+                             re.IGNORECASE)
+
+
+def _clean_phrase(phrase, max_words, from_end=False):
+    phrase = _LEADING_DET_RE.sub("", phrase.strip(" \t\"'"))
+    words = phrase.split()
+    if not words:
+        return None
+    words = words[-max_words:] if from_end else words[:max_words]
+    # a phrase must not start or end on a function word ("samples may", "and")
+    while words and words[-1].lower() in _FUNCTION_WORDS:
+        words.pop()
+    if not words or words[0].lower() in _FUNCTION_WORDS:
+        return None
+    phrase = " ".join(words).strip(" .")
+    if not re.search(r"[A-Za-z]{2}", phrase):
+        return None
+    return phrase
+
+
+def _subject(left):
+    # "ERK, which is essential for ..." -> the subject is ERK
+    relative = _RELATIVE_TAIL_RE.search(left)
+    if relative:
+        left = left[:relative.start()]
+    raising = _RAISING_TAIL_RE.search(left)
+    if raising:
+        left = left[:raising.start()]
+    m = _LEFT_BOUNDARY_RE.match(left)
+    return _clean_phrase(left[m.end():] if m else left, MAX_SUBJECT_WORDS, from_end=True)
+
+
+def _object(right):
+    m = _RIGHT_BOUNDARY_RE.search(right)
+    return _clean_phrase(right[:m.start()] if m else right, MAX_OBJECT_WORDS)
+
+
+def _relation_index(m):
+    for i in range(len(_RELATIONS)):
+        if m.group(f"r{i}"):
+            return i
+    return None
+
+
+def _reading(sentence, m, i, prev_verb):
+    """
+    How match `m` (relation `i`) is used: "verb", "modifier" (an adjective
+    inside a noun phrase, which does not end the previous object) or None
+    (not a relation here, but still a boundary).
+    """
+    # aux is a copula ("is", "were"); modals and perfect "has"/"have" keep the verb active
+    aux, modal, passive = m.group("aux"), (m.group("modal") or "").split(), bool(m.group("by"))
+    verb, after = m.group("verb"), sentence[m.end():]
+    if i in _STATIVE and not aux:
+        return None  # participle modifier ("genes involved in ...")
+    if aux and not passive and i not in _STATIVE:
+        return None  # passive without an agent ("genes were downregulated")
+    if not aux and i in _NOMINAL and re.match(r"\s+(?:in|of)\b", after) and not verb.endswith("ed"):
+        return None  # noun use ("an increase in expression")
+    if not aux and not passive and verb.endswith("ed"):
+        before = modal[-1:] or sentence[:m.start()].split()[-1:]
+        word = before[0].lower().strip(",") if before else ""
+        if word in ("to", "and", "or"):
+            # "leads to reduced density", "decreased proliferation and increased apoptosis";
+            # after and/or only if it is not coordinated with a verb ("X reduced Y and increased Z")
+            if _NOUN_PHRASE_RE.match(after) and (word == "to" or not prev_verb):
+                return "modifier"
+        elif not modal and word in _BEFORE_ADJECTIVE:
+            return None  # adjective use ("showed reduced activity")
+    return "verb"
+
+
+def extract_sentence(sentence):
+    """[(subject, relation, object)] candidates from one sentence."""
+    matches, prev_verb = [], False
+    for m in _VERB_RE.finditer(sentence):
+        i = _relation_index(m)
+        reading = _reading(sentence, m, i, prev_verb)
+        if reading != "modifier":
+            matches.append((m, i, reading == "verb"))
+            prev_verb = reading == "verb"
+
+    triplets = []
+    prev_end, prev_subject = 0, None
+    for n, (m, i, is_verb) in enumerate(matches):
+        # the object stops where the next relation verb starts
+        right = sentence[m.end():matches[n + 1][0].start() if n + 1 < len(matches) else len(sentence)]
+        between = sentence[prev_end:m.start()].strip(" ,").lower()
+        subject = None
+        if is_verb:
+            passive = bool(m.group("by"))
+            # "X reduces Y and impairs Z": the second verb shares X
+            shared = prev_subject and (between == "" or re.search(r"(?:^|\s)(?:and|or)$", between))
+            subject = prev_subject if shared else _subject(sentence[:m.start()])
+            obj = _object(right)
+            if passive:
+                # "Y is induced by X" / "Y induced by X" -> (X, induces, Y)
+                subject, obj = obj, subject
+            if subject and obj and subject.lower() != obj.lower():
+                triplets.append((subject, _RELATIONS[i][1], obj))
+        prev_end, prev_subject = m.end(), subject
+    return triplets
+
+
+def extract_paper(item):
+    """(pmcid, grouped) -> [{subject, relation, object, pmcid, section}]."""
+    pmcid, grouped = item
+    records = []
+    # whole sections (no windowing): sentences must not be cut; iter_structured yields cleaned text
+    for section, text in iter_section_chunks(grouped, window_words=sys.maxsize, overlap=0):
+        for sentence in split_sentences(text):
+            for subject, relation, obj in extract_sentence(sentence):
+                records.append({"subject": subject, "relation": relation, "object": obj,
+                                "pmcid": pmcid, "section": section})
+    return records
+
+
+def extract_corpus(papers, workers=None, chunksize=4):
+    """Yield one record list per paper, extracted across a process pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(extract_paper, papers)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(extract_paper, papers, chunksize=chunksize)
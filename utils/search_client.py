@@ -0,0 +1,27 @@
+import os
+
+import requests
+
+# e.g. SEARCH_SERVICE_URL=http://127.0.0.1:8765 to make the apps thin clients
+SEARCH_SERVICE_URL = os.environ.get("SEARCH_SERVICE_URL")
+
+
+class SearchClient:
+    """HTTP/JSON client for renderer/search-service.py; mirrors PaperSearcher.search."""
+
+    def __init__(self, base_url=SEARCH_SERVICE_URL, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def search(self, query, top_k=5, mode="auto"):
+        r = self.session.post(f"{self.base_url}/search",
+                              json={"query": query, "top_k": int(top_k), "mode": mode or "auto"},
+                              timeout=self.timeout)
+        r.raise_for_status()
+        return [(hit["item"], hit["score"]) for hit in r.json()["results"]]
+
+    def stats(self):
+        r = self.session.get(f"{self.base_url}/stats", timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
@@ -0,0 +1,88 @@
+import inspect
+
+import torch
+from transformers import TextStreamer
+
+from utils.inference import SUMMARY_BACKEND, load_seq2seq
+
+SUMMARY_MODEL = "allenai/led-large-16384-arxiv"
+MAX_INPUT_TOKENS = 16000
+GEN_KWARGS = {"max_length": 512, "num_beams": 4, "length_penalty": 2.0, "early_stopping": True}
+# Token streaming needs greedy decoding: beam search only settles on its output at the end
+STREAM_GEN_KWARGS = {"max_length": 512, "num_beams": 1, "do_sample": False}
+
+
+def build_input_text(paper):
+    title = paper.get("title") or paper.get("meta_title") or ""
+    abstract = paper.get("abstract") or ""
+    results = paper.get("results") or ""
+    return f"Title: {title}\n\nAbstract: {abstract}\n\nResults: {results}"
+
+
+def load_summarizer(model_name=SUMMARY_MODEL, device=None, backend=SUMMARY_BACKEND):
+    return load_seq2seq(model_name, device, backend)
+
+
+def token_lengths(texts, tokenizer, max_length=MAX_INPUT_TOKENS):
+    """Truncated input length of each text, used to bucket similar lengths together."""
+    encoded = tokenizer(list(texts), max_length=max_length, truncation=True)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def length_buckets(lengths, batch_size, max_batch_tokens):
+    """
+    Group indices into batches of similar length (shortest first) so padding
+    stays small. A batch closes at `batch_size` items or when padding every
+    item to the batch's longest input would exceed `max_batch_tokens`.
+    """
+    batches, batch, longest = [], [], 0
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        grown = max(longest, lengths[i])
+        if batch and (len(batch) >= batch_size or grown * (len(batch) + 1) > max_batch_tokens):
+            batches.append(batch)
+            batch, grown = [], lengths[i]
+        batch.append(i)
+        longest = grown
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def summarize_batch(texts, tokenizer, model, device, max_length=MAX_INPUT_TOKENS, gen_kwargs=None):
+    """Summarize a list of input texts in one padded generate() call."""
+    inputs = tokenizer(
+        list(texts),
+        return_tensors="pt",
+        max_length=max_length,
+        truncation=True,
+        padding=True
+    ).to(device)
+    extra = {}
+    if "global_attention_mask" in inspect.signature(model.forward).parameters:
+        # LED: global attention on the first token, as recommended for summarization
+        # (the ONNX Runtime export has no such input)
+        extra["global_attention_mask"] = torch.zeros_like(inputs["attention_mask"])
+        extra["global_attention_mask"][:, 0] = 1
+
+    with torch.inference_mode():
+        summary_ids = model.generate(**inputs, **extra, **(gen_kwargs or GEN_KWARGS))
+    return tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+
+
+class QueueStreamer(TextStreamer):
+    """TextStreamer that puts (key, text piece) on a queue instead of printing."""
+
+    def __init__(self, tokenizer, queue, key):
+        super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        self.queue = queue
+        self.key = key
+
+    def on_finalized_text(self, text, stream_end=False):
+        if text:
+            self.queue.put((self.key, text))
+
+
+def stream_summary(text, tokenizer, model, device, streamer, max_length=MAX_INPUT_TOKENS, gen_kwargs=None):
+    """Summarize one input, handing each decoded piece to `streamer` as it is generated."""
+    gen_kwargs = {**(gen_kwargs or STREAM_GEN_KWARGS), "streamer": streamer}
+    return summarize_batch([text], tokenizer, model, device, max_length, gen_kwargs)[0]
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+SUMMARIES_FILE = "data/summaries.json"
+
+
+def input_hash(text, model_name):
+    """Identifies one summarizer input: a changed paper or model means a stale summary."""
+    return hashlib.sha1(f"{model_name}\n{text}".encode("utf-8")).hexdigest()
+
+
+class SummaryStore:
+    """
+    Summaries keyed by PMCID, stored as the JSON array scripts/summarizer.py
+    has always written ({"pmcid", "title", "summary"} plus "input_hash",
+    "model" and "mode": "full", "fast" for a summary of an extractively
+    reduced input, or "stream" for a greedy-decoded summary streamed by the
+    summary app). Saves are atomic, so the file can be checkpointed after every
+    batch and read by the apps while a run is in progress.
+    """
+
+    def __init__(self, path=SUMMARIES_FILE):
+        self.path = Path(path)
+        self._entries = {}
+        self._dirty = set()  # put() but not saved yet
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.reload()
+
+    def reload(self):
+        """Re-read the file if another process rewrote it since the last load/save."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        with self._lock:
+            # keep results written locally but not saved yet
+            merged = {entry["pmcid"]: entry for entry in entries if entry.get("pmcid")}
+            merged.update((pmcid, self._entries[pmcid]) for pmcid in self._dirty)
+            self._entries = merged
+            self._mtime = mtime
+        return True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, pmcid):
+        return pmcid in self._entries
+
+    def get(self, pmcid, input_hash=None, allow_legacy=False, allow_fast=False, allow_stream=False):
+        """
+        The entry for `pmcid`, or None. With `input_hash` (always the hash of
+        the full input), only an entry made from that exact paper text counts;
+        `allow_fast` also accepts fast-mode summaries of it, `allow_stream`
+        greedy streamed ones, and `allow_legacy` entries written before
+        hashes were recorded.
+        """
+        entry = self._entries.get(pmcid)
+        if entry is None or input_hash is None:
+            return entry
+        if entry.get("input_hash") == input_hash:
+            mode = entry.get("mode", "full")
+            accepted = mode == "full" or (allow_fast and mode == "fast") or (allow_stream and mode == "stream")
+            return entry if accepted else None
+        if allow_legacy and "input_hash" not in entry:
+            return entry
+        return None
+
+    def is_current(self, pmcid, input_hash, allow_fast=False, allow_stream=False):
+        return self.get(pmcid, input_hash, allow_fast=allow_fast, allow_stream=allow_stream) is not None
+
+    def put(self, pmcid, title, summary, input_hash, model, mode="full"):
+        with self._lock:
+            self._entries[pmcid] = {
+                "pmcid": pmcid,
+                "title": title,
+                "summary": summary,
+                "input_hash": input_hash,
+                "model": model,
+                "mode": mode,
+            }
+            self._dirty.add(pmcid)
+
+    def save(self):
+        # pick up entries another process checkpointed meanwhile
+        self.reload()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(f"{self.path}.tmp")
+        with self._lock:
+            entries = list(self._entries.values())
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty.clear()
+            self._mtime = os.stat(self.path).st_mtime_ns
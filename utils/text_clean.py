@@ -0,0 +1,77 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Character-level fixes: minus sign (U+2212) -> hyphen, stray backslashes and
+# zero-width spaces dropped. Other unicode spaces are handled by str.split().
+_CHAR_FIXES = (("\u2212", "-"), ("\\", ""), ("\u200b", ""))
+
+# Literal escape sequences left in some BioC passages (e.g. "\u2212", "\n").
+# Decoded explicitly instead of an encode('utf-8').decode('unicode_escape')
+# round trip, which turned every non-ASCII character into mojibake.
+_ESCAPE_RE = re.compile(r"\\u([0-9a-fA-F]{4})|\\x([0-9a-fA-F]{2})|\\[ntr]")
+
+# UTF-8 byte sequences that were decoded as Latin-1 ("â\x80\x94" for "—", "Î¼" for "μ")
+_MOJIBAKE_RE = re.compile(r"[\u00c2-\u00f4][\u0080-\u00bf]{1,3}")
+
+# Figure/table references and review notes, fused into one pattern:
+# (Fig. 1A), (Table 2), "Refer to Fig. 3B", "(for full review see ...)"
+_DROP_RE = re.compile(
+    r"\(Fig\.[^)]*\)"
+    r"|\(Table[^)]*\)"
+    r"|Refer to Fig\.[^\s.]*\.?"
+    r"|\((?i:for full review see)[^)]*\)"
+)
+
+# Leading section numbers / bullets like "2.1. "
+_LEADING_NUM_RE = re.compile(r"^\d+(?:\.\d+)*\s*\.?\s*")
+
+
+def _decode_escape(m):
+    if m.group(1):
+        return chr(int(m.group(1), 16))
+    if m.group(2):
+        return chr(int(m.group(2), 16))
+    return " "
+
+
+def _fix_mojibake_match(m):
+    s = m.group(0)
+    try:
+        return s.encode("latin-1").decode("utf-8")
+    except UnicodeError:
+        return s
+
+
+def fix_mojibake(text: str):
+    """Repair UTF-8 text that was mis-decoded as Latin-1."""
+    return _MOJIBAKE_RE.sub(_fix_mojibake_match, text)
+
+
+def clean_text(text: str):
+    """Clean and normalize one passage of BioC text."""
+    if not text:
+        return ""
+    if "\\" in text:
+        text = _ESCAPE_RE.sub(_decode_escape, text)
+    text = fix_mojibake(text)
+    for old, new in _CHAR_FIXES:
+        if old in text:
+            text = text.replace(old, new)
+    text = _DROP_RE.sub("", text)
+    # Normalize multiple spaces / newlines
+    text = " ".join(text.split())
+    return _LEADING_NUM_RE.sub("", text, count=1)
+
+
+def clean_batch(texts, workers=None, chunksize=256):
+    """
+    Clean a list of passages. Large batches are spread over a process pool;
+    small ones (or workers=1) are cleaned in-process.
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(texts) < chunksize * 2:
+        return [clean_text(t) for t in texts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(clean_text, texts, chunksize=chunksize))
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from utils.bioc_client import TokenBucket
+from utils.chunk_store import iter_section_chunks
+from utils.corpus import STRUCTURED_FILE, iter_structured
+
+TRIPLETS_FILE = "output/triplets-new.json"
+# The offline stub backend writes here, so it never overwrites real LLM output
+STUB_TRIPLETS_FILE = "output/triplets-stub.json"
+TRIPLET_CACHE_DIR = "data/triplets/cache"
+# One prompt per section, long sections split into windows of this many words
+PROMPT_WINDOW_WORDS = 1200
+PROMPT_WINDOW_OVERLAP = 100
+DEFAULT_CONCURRENCY = 4
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+# Bump when the prompt or the validation changes, so cached chunks are redone
+PROMPT_VERSION = 1
+
+PROMPT = """Extract semantic triplets (subject, relation, object) from the following text
+of a space biology paper (section: {section}).
+Keep subjects and objects short noun phrases, and relations short verb phrases.
+Output only a JSON list of objects with the keys "subject", "relation" and "object".
+
+{text}
+"""
+
+
+def iter_chunks(path=STRUCTURED_FILE, limit=None):
+    """Yield {"seq", "pmcid", "section", "text"} prompt chunks from the section hierarchy."""
+    seq = 0
+    for n, (pmcid, grouped) in enumerate(iter_structured(path)):
+        if limit is not None and n >= limit:
+            return
+        for section, text in iter_section_chunks(grouped, PROMPT_WINDOW_WORDS, PROMPT_WINDOW_OVERLAP):
+            yield {"seq": seq, "pmcid": pmcid, "section": section, "text": text}
+            seq += 1
+
+
+def chunk_key(chunk, backend_name):
+    payload = f"{PROMPT_VERSION}\n{backend_name}\n{chunk['section']}\n{chunk['text']}"
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+
+
+def parse_triplets(response_text):
+    """
+    Validate an LLM response: a JSON list of {subject, relation, object}
+    (a "predicate" key or [s, r, o] lists are accepted too). Raises
+    ValueError when no JSON list can be recovered; drops malformed items.
+    """
+    text = _FENCE_RE.sub("", (response_text or "").strip())
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end < start:
+        raise ValueError("no JSON list in response")
+    try:
+        items = json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from e
+
+    triplets = []
+    for item in items:
+        if isinstance(item, dict):
+            values = (item.get("subject"), item.get("relation") or item.get("predicate"), item.get("object"))
+        elif isinstance(item, (list, tuple)) and len(item) == 3:
+            values = tuple(item)
+        else:
+            continue
+        if all(isinstance(v, str) and v.strip() for v in values):
+            triplets.append(dict(zip(("subject", "relation", "object"), (v.strip() for v in values))))
+    return triplets
+
+
+class GeminiBackend:
+    """Google Gemini through google-generativeai; the key comes from GOOGLE_API_KEY."""
+
+    def __init__(self, model_name="gemini-2.5-flash", api_key=None):
+        import google.generativeai as genai
+
+        api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+        if not api_key:
+            raise RuntimeError("set GOOGLE_API_KEY to use the gemini backend")
+        genai.configure(api_key=api_key)
+        self.name = f"gemini:{model_name}"
+        self._model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        return self._model.generate_content(prompt).text
+
+
+class StubBackend:
+    """
+    Offline stand-in that answers instantly with one well-formed triplet per
+    chunk, so the pipeline (chunking, caching, merging) can run without a key.
+    """
+
+    name = "stub"
+
+    def generate(self, prompt):
+        section = re.search(r"\(section: (.*?)\)", prompt)
+        text = prompt.split("\n\n", 1)[-1]
+        first = " ".join(text.split()[:6])
+        return json.dumps([{"subject": section.group(1) if section else "text", "relation": "mentions",
+                            "object": first}])
+
+
+BACKENDS = {"gemini": GeminiBackend, "stub": StubBackend}
+
+
+def make_backend(name, **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
+
+class TripletCache:
+    """One JSON file of triplets per chunk key under TRIPLET_CACHE_DIR."""
+
+    def __init__(self, root=TRIPLET_CACHE_DIR):
+        self.root = Path(root)
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, triplets):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(triplets, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def extract_chunk(backend, chunk, limiter=None, max_retries=MAX_RETRIES):
+    """Prompt the backend for one chunk, retrying API errors and invalid JSON with backoff."""
+    prompt = PROMPT.format(section=chunk["section"], text=chunk["text"])
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return parse_triplets(backend.generate(prompt))
+        except Exception:
+            if attempt == max_retries:
+                raise
+            time.sleep(min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * (0.5 + random.random() / 2))
+
+
+def run_pipeline(chunks, backend, cache=None, concurrency=DEFAULT_CONCURRENCY, rate=None,
+                 max_retries=MAX_RETRIES):
+    """
+    Yield (chunk, triplets, cached) for every chunk; triplets is None when
+    a chunk still failed after retries. Cached chunks never reach the
+    backend; the rest fan out over `concurrency` threads, optionally capped
+    at `rate` requests per second.
+    """
+    cache = cache if cache is not None else TripletCache()
+    limiter = TokenBucket(rate) if rate else None
+    todo = []
+    for chunk in chunks:
+        key = chunk_key(chunk, backend.name)
+        triplets = cache.get(key)
+        if triplets is not None:
+            yield chunk, triplets, True
+        else:
+            todo.append((key, chunk))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(extract_chunk, backend, chunk, limiter, max_retries): (key, chunk)
+                   for key, chunk in todo}
+        for future in as_completed(futures):
+            key, chunk = futures[future]
+            try:
+                triplets = future.result()
+            except Exception as e:
+                print(f"Chunk {chunk['pmcid']} / {chunk['section']} failed: {e}")
+                yield chunk, None, False
+                continue
+            cache.put(key, triplets)
+            yield chunk, triplets, False
+
+
+def merge_triplets(results):
+    """
+    Flatten pipeline results into {subject, relation, object, pmcid, section}
+    records, in corpus order regardless of which requests finished first.
+    """
+    records = []
+    for chunk, triplets, _ in sorted(results, key=lambda r: r[0]["seq"]):
+        for t in triplets or ():
+            records.append({**t, "pmcid": chunk["pmcid"], "section": chunk["section"]})
+    return records